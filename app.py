@@ -1,21 +1,36 @@
 import os
+import sys
+import cProfile
+import functools
 import json
+import math
+import mimetypes
 import logging
 import re
+import html
+import bisect
+import sqlite3
+import subprocess
+import unicodedata
 import wave
-import whisper
 import pyaudio
 import numpy as np
 import threading
+import time
+import queue
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
 from io import BytesIO
-from datetime import datetime
-from flask import Flask, render_template, request, redirect, url_for, jsonify, session, send_from_directory, flash
+from urllib.parse import quote
+from datetime import datetime, timedelta
+from flask import Flask, Response, g, render_template, request, redirect, url_for, jsonify, session, send_from_directory, flash, stream_with_context
+from werkzeug.security import safe_join
 from werkzeug.utils import secure_filename
-from googletrans import Translator
-from duden import get
 
 # Configure logging
-logging.basicConfig(level=logging.DEBUG)
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
 
 # Initialize Flask app
@@ -24,170 +39,1081 @@ app.secret_key = os.environ.get("SESSION_SECRET",
                                 "devkey-replace-in-production")
 
 
+class Metrics:
+    """In-process counters and histograms rendered in Prometheus text format"""
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self.collectors = []
+        self.lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            # Per-bucket counts followed by the sum and the count
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [0] * len(self.BUCKETS) + [0.0, 0]
+            for i, bound in enumerate(self.BUCKETS):
+                if value <= bound:
+                    histogram[i] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe the duration of a block; failures also count as errors"""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc(name.replace('_duration_seconds', '_errors_total'), **labels)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def timed(self, name, **labels):
+        """Decorator form of timer()"""
+
+        def decorate(func):
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorate
+
+    def collect(self, collector):
+        """Register a callable returning (name, labels, value) gauges at scrape time"""
+        self.collectors.append(collector)
+
+    @staticmethod
+    def _series(name, labels, extra=()):
+        pairs = [*labels, *extra]
+        if not pairs:
+            return name
+        escaped = ','.join(
+            '{}="{}"'.format(key, str(value).replace('\\', '\\\\')
+                             .replace('"', '\\"').replace('\n', '\\n'))
+            for key, value in pairs)
+        return f"{name}{{{escaped}}}"
+
+    def render(self):
+        with self.lock:
+            counters = dict(self.counters)
+            histograms = {key: list(value) for key, value in self.histograms.items()}
+        gauges = {}
+        for collector in self.collectors:
+            for name, labels, value in collector():
+                gauges[(name, tuple(sorted(labels.items())))] = value
+
+        lines = []
+        for kind, series in (('counter', counters), ('gauge', gauges)):
+            for name in sorted({name for name, _ in series}):
+                lines.append(f"# TYPE {name} {kind}")
+                for (series_name, labels), value in sorted(series.items()):
+                    if series_name == name:
+                        lines.append(f"{self._series(name, labels)} {value}")
+        for name in sorted({name for name, _ in histograms}):
+            lines.append(f"# TYPE {name} histogram")
+            for (series_name, labels), values in sorted(histograms.items()):
+                if series_name != name:
+                    continue
+                for bound, count in zip(self.BUCKETS, values):
+                    lines.append(f"{self._series(name + '_bucket', labels, [('le', bound)])} {count}")
+                lines.append(f"{self._series(name + '_bucket', labels, [('le', '+Inf')])} {values[-1]}")
+                lines.append(f"{self._series(name + '_sum', labels)} {values[-2]}")
+                lines.append(f"{self._series(name + '_count', labels)} {values[-1]}")
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+# Requests slower than PROFILE_SLOW_REQUESTS seconds leave a cProfile dump
+# in PROFILE_DIR (view with snakeviz or flameprof); 0 disables profiling
+PROFILE_SLOW_REQUESTS = float(os.environ.get("PROFILE_SLOW_REQUESTS", "0"))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+# cProfile supports one active profiler per process, so requests take turns
+profile_lock = threading.Lock()
+# Responses using stream_with_context keep the request open until the stream
+# ends, which would hold the profiler for the whole session
+UNPROFILED_ENDPOINTS = {'stream_audio_transcription'}
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    if (PROFILE_SLOW_REQUESTS
+            and request.endpoint not in UNPROFILED_ENDPOINTS
+            and profile_lock.acquire(blocking=False)):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            g.profiler = profiler
+        except ValueError:
+            # Another profiler (e.g. a debugger) is already attached
+            profile_lock.release()
+
+
+@app.after_request
+def record_request_metrics(response):
+    if 'request_started' in g:
+        metrics.observe('http_request_duration_seconds',
+                        time.perf_counter() - g.request_started,
+                        endpoint=request.endpoint or 'unmatched',
+                        method=request.method,
+                        status=response.status_code)
+    return response
+
+
+@app.teardown_request
+def stop_request_profiler(exc):
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return
+    profiler.disable()
+    profile_lock.release()
+    elapsed = time.perf_counter() - g.request_started
+    if elapsed >= PROFILE_SLOW_REQUESTS:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(
+            PROFILE_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-"
+            f"{request.endpoint or 'unmatched'}-{int(elapsed * 1000)}ms.prof")
+        profiler.dump_stats(path)
+        logger.warning(f"Slow request {request.path} took {elapsed:.2f}s, "
+                       f"profile written to {path}")
+
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Latency, external call and queue metrics in Prometheus text format"""
+    return Response(metrics.render(),
+                    mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
 @app.before_request
 def load_last_directory():
-    global VIDEO_DIRECTORY
-    last_directory = request.cookies.get('last_directory')
-    if last_directory and os.path.isdir(last_directory):
-        VIDEO_DIRECTORY = last_directory
+    """Bind the browser's library root to this request only"""
+    g.library_root = (library_roots.resolve(request.cookies.get('last_directory'))
+                      or library_roots.default)
+
+
+def library_root():
+    """Library root selected by the browser making the current request"""
+    return g.library_root
 
 
 # Audio recording configuration
 CHUNK = 2048
 FORMAT = pyaudio.paInt16
 CHANNELS = 1
-RATE = 44100
+WHISPER_RATE = 16000
+# Capture directly at Whisper's rate; only devices that cannot do 16 kHz
+# need AUDIO_RATE, in which case samples are resampled in NumPy
+RATE = int(os.environ.get("AUDIO_RATE", WHISPER_RATE))
+BUFFER_SECONDS = 300
+
+# Streaming transcription: a segment is closed once speech is followed by
+# this much silence, or when it grows past the maximum length
+STREAM_SILENCE_RMS = 500
+STREAM_SILENCE_SECONDS = 0.6
+STREAM_MAX_SEGMENT_SECONDS = 20
+STREAM_PARTIAL_INTERVAL = 2.0
+# Live segments share this many Whisper slots; partials are skipped while
+# the slots are busy or transcription jobs are waiting
+STREAM_SLOTS = int(os.environ.get("STREAM_TRANSCRIPTION_SLOTS", "1"))
+
+
+class PcmBuffer:
+    """Preallocated int16 sample buffer that grows by doubling"""
+
+    def __init__(self, seconds=BUFFER_SECONDS):
+        self.data = np.empty(RATE * seconds, dtype=np.int16)
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def append(self, pcm):
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        end = self.length + len(samples)
+        if end > len(self.data):
+            grown = np.empty(max(end, 2 * len(self.data)), dtype=np.int16)
+            grown[:self.length] = self.data[:self.length]
+            self.data = grown
+        self.data[self.length:end] = samples
+        self.length = end
+
+    def view(self, start=0, end=None):
+        """Samples without copying; stays valid even if the buffer grows"""
+        return self.data[start:self.length if end is None else end]
+
+
+def to_whisper_audio(samples):
+    """Convert int16 samples at RATE to the float32 16 kHz array Whisper expects"""
+    audio = samples.astype(np.float32) / 32768.0
+    if RATE != WHISPER_RATE and len(audio):
+        target_len = int(len(audio) * WHISPER_RATE / RATE)
+        audio = np.interp(np.linspace(0, len(audio) - 1, target_len),
+                          np.arange(len(audio)),
+                          audio).astype(np.float32)
+    return audio
+
+
+def chunk_level(samples):
+    """Root-mean-square level of one chunk of int16 samples"""
+    samples = samples.astype(np.float32)
+    return float(np.sqrt(np.mean(samples**2))) if len(samples) else 0.0
+
+
+class SpeechModel:
+    """Lazily loaded speech-to-text model behind one transcribe() call"""
+
+    def __init__(self, backend="whisper", model_name="turbo",
+                 compute_type="float32", threads=0):
+        self.backend = backend
+        self.model_name = model_name
+        self.compute_type = compute_type
+        self.threads = threads
+        self.model = None
+        self.load_lock = threading.Lock()
+        # One loaded model is shared by every recorder; inference on it is
+        # not thread-safe, so calls are serialized
+        self.inference_lock = threading.Lock()
+
+    def load(self):
+        with self.load_lock:
+            if self.model is None:
+                started = time.time()
+                if self.backend == "faster-whisper":
+                    self.model = self._load_faster_whisper()
+                else:
+                    self.model = self._load_whisper()
+                logger.info(
+                    f"Loaded {self.backend} model '{self.model_name}' "
+                    f"({self.compute_type}) in {time.time() - started:.1f}s")
+            return self.model
+
+    def _load_whisper(self):
+        import torch
+        import whisper
+
+        if self.threads:
+            torch.set_num_threads(self.threads)
+        model = whisper.load_model(self.model_name, device="cpu")
+        if self.compute_type == "int8":
+            model = torch.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8)
+        return model
+
+    def _load_faster_whisper(self):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise RuntimeError(
+                "WHISPER_BACKEND=faster-whisper requires the faster-whisper "
+                "package (pip install faster-whisper)")
+
+        return WhisperModel(self.model_name,
+                            device="cpu",
+                            compute_type=self.compute_type,
+                            cpu_threads=self.threads)
+
+    def warm_up(self):
+        """Load the model in a background thread so startup is not blocked"""
+
+        def load():
+            try:
+                self.load()
+            except Exception as e:
+                logger.error(f"Error loading speech model: {e}")
+
+        threading.Thread(target=load, daemon=True).start()
+
+    @contextmanager
+    def _inference(self, audio):
+        """Hold the inference lock and record wait, wall time and speed"""
+        queued = time.perf_counter()
+        with self.inference_lock:
+            started = time.perf_counter()
+            metrics.observe('whisper_lock_wait_seconds', started - queued)
+            try:
+                with metrics.timer('external_call_duration_seconds',
+                                   service='whisper'):
+                    yield
+            finally:
+                elapsed = time.perf_counter() - started
+                audio_seconds = len(audio) / WHISPER_RATE
+                metrics.inc('whisper_audio_seconds_total', audio_seconds)
+                metrics.inc('whisper_inference_seconds_total', elapsed)
+                if audio_seconds:
+                    metrics.observe('whisper_realtime_factor',
+                                    elapsed / audio_seconds)
+
+    def transcribe(self, audio, language="de", prompt=None):
+        model = self.load()
+        with self._inference(audio):
+            if self.backend == "faster-whisper":
+                segments, _ = model.transcribe(audio,
+                                               language=language,
+                                               initial_prompt=prompt)
+                return ' '.join(segment.text.strip() for segment in segments)
+            result = model.transcribe(audio,
+                                      language=language,
+                                      initial_prompt=prompt,
+                                      fp16=False,
+                                      verbose=False)
+            return result["text"].strip()
+
+    def transcribe_segments(self, audio, language="de", prompt=None):
+        """Like transcribe(), but as (start, end, text) tuples in seconds"""
+        model = self.load()
+        with self._inference(audio):
+            if self.backend == "faster-whisper":
+                segments, _ = model.transcribe(audio,
+                                               language=language,
+                                               initial_prompt=prompt)
+                return [(segment.start, segment.end, segment.text.strip())
+                        for segment in segments]
+            result = model.transcribe(audio,
+                                      language=language,
+                                      initial_prompt=prompt,
+                                      fp16=False,
+                                      verbose=False)
+            return [(segment["start"], segment["end"], segment["text"].strip())
+                    for segment in result["segments"]]
+
+
+# Speech model configuration; nothing is loaded until the first
+# transcription unless WHISPER_WARMUP is set
+speech_model = SpeechModel(
+    backend=os.environ.get("WHISPER_BACKEND", "whisper"),
+    model_name=os.environ.get("WHISPER_MODEL", "turbo"),
+    compute_type=os.environ.get("WHISPER_COMPUTE_TYPE", "float32"),
+    threads=int(os.environ.get("WHISPER_THREADS", "0")))
+if os.environ.get("WHISPER_WARMUP", "0") == "1":
+    speech_model.warm_up()
+
+
+_pyaudio = None
+_pyaudio_lock = threading.Lock()
+
+
+def get_pyaudio():
+    """Process-wide PyAudio instance, created on first use"""
+    global _pyaudio
+    with _pyaudio_lock:
+        if _pyaudio is None:
+            _pyaudio = pyaudio.PyAudio()
+        return _pyaudio
 
 
 class AudioRecorder:
 
     def __init__(self):
-        self.audio = pyaudio.PyAudio()
         self.stream = None
-        self.frames = []
+        self.buffer = PcmBuffer(seconds=0)
+        # Samples of the last stopped take, kept for playback
+        self.last_take = self.buffer.view()
+        self.take_stopped = threading.Event()
         self.is_recording = False
         self.is_paused = False
-        self.whisper_model = whisper.load_model("turbo", device="cpu")
         self.lock = threading.Lock()
-        self.recording_thread = None
-
-    def start_recording(self):
+        # Notified by the capture callback for every chunk and on stop
+        self.captured = threading.Condition(self.lock)
+        self.level = 0.0
+        self.streaming = False
+        self.stream_thread = None
+        self.stream_events = []
+        self.stream_segments = []
+        self.stream_tail = []
+        self.stream_cond = threading.Condition()
+
+    def start_recording(self, streaming=False):
         if not self.is_recording:
-            self.stream = self.audio.open(format=FORMAT,
+            self.buffer = PcmBuffer()
+            self.level = 0.0
+            # PortAudio calls _on_audio once per chunk from its own thread, so
+            # no Python thread polls the device. If the device cannot be
+            # opened, the recorder stays idle and the error reaches the caller
+            self.stream = get_pyaudio().open(format=FORMAT,
                                           channels=CHANNELS,
                                           rate=RATE,
                                           input=True,
-                                          frames_per_buffer=CHUNK)
-            self.frames = []
+                                          frames_per_buffer=CHUNK,
+                                          stream_callback=self._on_audio)
             self.is_recording = True
             self.is_paused = False
-            self.recording_thread = threading.Thread(target=self._record)
-            self.recording_thread.start()
+            self.take_stopped = threading.Event()
+            self.streaming = streaming
+            if streaming:
+                # Each take has its own lists, so a thread still flushing the
+                # previous take never writes into the new one
+                with self.stream_cond:
+                    self.stream_events = []
+                    self.stream_segments = []
+                    self.stream_tail = []
+                self.stream_thread = threading.Thread(
+                    target=self._stream_transcribe,
+                    args=(self.buffer, self.stream_segments,
+                          self.stream_events, self.stream_tail,
+                          self.take_stopped))
+                self.stream_thread.start()
             return True
         return False
 
-    def _record(self):
-        while self.is_recording:
-            if not self.is_paused:
-                try:
-                    data = self.stream.read(CHUNK, exception_on_overflow=False)
-                    with self.lock:
-                        self.frames.append(data)
-                except Exception as e:
-                    logger.error(f"Error recording audio: {e}")
-                    break
+    def _on_audio(self, data, frame_count, time_info, status):
+        try:
+            with self.captured:
+                self.buffer.append(data)
+                self.captured.notify_all()
+            self.level = chunk_level(np.frombuffer(data, dtype=np.int16))
+        except Exception as e:
+            logger.error(f"Error recording audio: {e}")
+            return None, pyaudio.paAbort
+        return None, pyaudio.paContinue
 
     def pause_recording(self):
-        self.is_paused = True
+        # A stopped stream delivers no callbacks, so pausing costs no CPU
+        if self.is_recording and not self.is_paused:
+            self.is_paused = True
+            self.stream.stop_stream()
+            self.level = 0.0
         return True
 
     def resume_recording(self):
-        self.is_paused = False
+        if self.is_recording and self.is_paused:
+            self.is_paused = False
+            self.stream.start_stream()
         return True
 
-    def stop_recording(self):
-        if self.is_recording:
+    def input_level(self):
+        """RMS level of the latest captured chunk, scaled to 0..1"""
+        if not self.is_recording or self.is_paused:
+            return 0.0
+        return min(1.0, self.level / 32768.0)
+
+    def _stop_capture(self):
+        # stop_stream() returns once the last callback has run, so the
+        # buffer is complete before the streaming thread sees the stop
+        if self.stream:
+            self.stream.stop_stream()
+            self.stream.close()
+        with self.captured:
             self.is_recording = False
             self.is_paused = False
-            if self.stream:
-                self.stream.stop_stream()
-                self.stream.close()
-            if self.recording_thread:
-                self.recording_thread.join()
-
-            # Save audio to temporary file
-            temp_path = "static/temp_audio.wav"
-            with wave.open(temp_path, 'wb') as wf:
-                wf.setnchannels(CHANNELS)
-                wf.setsampwidth(self.audio.get_sample_size(FORMAT))
-                wf.setframerate(RATE)
-                wf.writeframes(b''.join(self.frames))
-
-            # Return audio path immediately
-            self.frames = []  # Clear frames after saving
-            
-            # Start transcription in background
-            def transcribe_later():
-                transcription = self.transcribe_audio()
-                return transcription
-            
-            return {"audio_path": "/static/temp_audio.wav"}
+            self.level = 0.0
+            self.take_stopped.set()
+            self.captured.notify_all()
+
+    def stop_recording(self):
+        if self.is_recording:
+            self._stop_capture()
+
+            # The samples stay in memory; a WAV is only encoded when the
+            # player actually requests playback. The job gets this take's
+            # state, since another take may start before it runs
+            self.last_take = self.buffer.view()
+            if self.streaming:
+                # The streaming thread only completes a transcription already
+                # in progress; the rest of the take goes through the queue
+                self.stream_thread.join()
+                samples = (self.buffer.view(self.stream_tail[0])
+                           if self.stream_tail else None)
+                try:
+                    job_id = transcription_jobs.submit(
+                        self.finish_streaming, samples, self.stream_segments,
+                        self.stream_events)
+                except RuntimeError:
+                    self._emit(self.stream_events, 'done',
+                               text=' '.join(self.stream_segments))
+                    raise
+            else:
+                job_id = transcription_jobs.submit(self.transcribe_take,
+                                                   self.last_take)
+            return {"audio_path": "/api/audio/recording.wav", "job_id": job_id}
         return {"transcription": "", "audio_path": ""}
 
-    def transcribe_audio(self):
-        if not os.path.exists("static/temp_audio.wav"):
+    def close(self):
+        """Stop capturing without transcribing, e.g. when evicted"""
+        if self.is_recording:
+            self._stop_capture()
+            if self.streaming:
+                self.stream_thread.join()
+                self._emit(self.stream_events, 'done',
+                           text=' '.join(self.stream_segments))
+
+    def recording_wav(self):
+        """Encode the last recording as WAV bytes for playback"""
+        wav = BytesIO()
+        with wave.open(wav, 'wb') as wf:
+            wf.setnchannels(CHANNELS)
+            wf.setsampwidth(pyaudio.get_sample_size(FORMAT))
+            wf.setframerate(RATE)
+            wf.writeframes(self.last_take.tobytes())
+        return wav.getvalue()
+
+    def transcribe_take(self, samples):
+        """Transcribe the int16 samples of one take"""
+        return self.transcribe_audio(to_whisper_audio(samples))
+
+    def transcribe_audio(self, audio=None, prompt=None):
+        """Transcribe a float32 16 kHz array, defaulting to the last recording"""
+        if audio is None:
+            audio = to_whisper_audio(self.last_take)
+        if not len(audio):
             return ""
 
+        try:
+            return speech_model.transcribe(audio, language="de",
+                                           prompt=prompt)
+        except Exception as e:
+            logger.error(f"Error transcribing audio: {e}")
+            return ""
+
+    def _emit(self, events, event_type, **data):
+        with self.stream_cond:
+            events.append({'type': event_type, **data})
+            self.stream_cond.notify_all()
+
+    def stream_events_since(self, index, timeout=15):
+        """Block until events after index exist (or timeout) and return them"""
+        with self.stream_cond:
+            self.stream_cond.wait_for(lambda: len(self.stream_events) > index,
+                                      timeout=timeout)
+            return self.stream_events[index:]
+
+    def _transcribe_segment(self, samples, final, segments, events):
+        prompt = ' '.join(segments[-2:]) or None
+        text = self.transcribe_audio(to_whisper_audio(samples), prompt=prompt)
+        if final:
+            if text:
+                segments.append(text)
+            self._emit(events, 'final', text=text)
+        else:
+            self._emit(events, 'partial', text=text)
+
+    def _stream_transcribe(self, buffer, segments, events, tail, stopped):
+        """Feed voice-activity segments of the live sample buffer to Whisper
+
+        Once capture stops, the offset of the unfinished segment (if it has
+        speech) is appended to tail for finish_streaming.
+        """
+        chunk_seconds = CHUNK / RATE
+        silence_chunks = max(1, int(STREAM_SILENCE_SECONDS / chunk_seconds))
+        max_chunks = int(STREAM_MAX_SEGMENT_SECONDS / chunk_seconds)
+        levels = []
+        seg_start = 0
+        speech_seen = False
+        silent_run = 0
+        last_partial = time.time()
+
+        while True:
+            finished = stopped.is_set()
+            with self.lock:
+                available = len(buffer) // CHUNK
+
+            # Walk the new chunks and close a segment at the first pause
+            boundary = None
+            for i in range(len(levels), available):
+                levels.append(
+                    chunk_level(buffer.view(i * CHUNK, (i + 1) * CHUNK)))
+                if levels[i] >= STREAM_SILENCE_RMS:
+                    speech_seen = True
+                    silent_run = 0
+                else:
+                    silent_run += 1
+                # After the stop the rest is left to finish_streaming whole
+                if not finished and speech_seen and (
+                        silent_run >= silence_chunks
+                        or i + 1 - seg_start >= max_chunks):
+                    boundary = i + 1
+                    break
+                if not speech_seen and silent_run >= silence_chunks:
+                    # Drop leading silence instead of sending it to Whisper,
+                    # keeping two chunks of lead-in for soft word onsets
+                    seg_start = max(seg_start, i - 1)
+                    silent_run = 0
+
+            if boundary is not None:
+                with stream_slots:
+                    self._transcribe_segment(
+                        buffer.view(seg_start * CHUNK, boundary * CHUNK),
+                        True, segments, events)
+                seg_start = boundary
+                speech_seen = False
+                silent_run = 0
+                last_partial = time.time()
+                continue
+
+            if finished and len(levels) >= available:
+                if speech_seen:
+                    tail.append(seg_start * CHUNK)
+                return
+
+            if (speech_seen
+                    and time.time() - last_partial >= STREAM_PARTIAL_INTERVAL):
+                # Partials are a preview, so they never wait for Whisper
+                if (not transcription_jobs.pending()
+                        and stream_slots.acquire(blocking=False)):
+                    try:
+                        self._transcribe_segment(
+                            buffer.view(seg_start * CHUNK, available * CHUNK),
+                            False, segments, events)
+                    finally:
+                        stream_slots.release()
+                last_partial = time.time()
+
+            # Sleep until the callback delivers a chunk or capture stops;
+            # while paused nothing arrives, so the thread stays idle
+            with self.captured:
+                self.captured.wait_for(
+                    lambda: len(buffer) // CHUNK > available
+                    or stopped.is_set(),
+                    timeout=STREAM_PARTIAL_INTERVAL if speech_seen else None)
+
+    def finish_streaming(self, samples, segments, events):
+        """Transcribe the unfinished end of a streamed take, return its text"""
+        if samples is not None:
+            self._transcribe_segment(samples, True, segments, events)
+        text = ' '.join(segments)
+        self._emit(events, 'done', text=text)
+        return text
+
+
+class BackgroundJobs:
+    """Background job queue (transcriptions, prefetches) with pollable IDs"""
+
+    def __init__(self, name, max_workers=1, max_pending=8, max_age=3600):
+        self.name = name
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix=name)
+        self.jobs = {}
+        self.futures = {}
+        self.max_pending = max_pending
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        metrics.collect(self.queue_depth)
+
+    def queue_depth(self):
+        """Queued and running jobs, as gauges for /metrics"""
         with self.lock:
-            try:
-                # Read the saved WAV file
-                result = self.whisper_model.transcribe("static/temp_audio.wav",
-                                                     language="de",
-                                                     verbose=False)
-                print(result)
-                return result["text"].strip()
-            except Exception as e:
-                logger.error(f"Error transcribing audio: {e}")
-                return ""
+            statuses = [job['status'] for job in self.jobs.values()]
+        return [('background_jobs', {'queue': self.name, 'status': status},
+                 statuses.count(status)) for status in ('queued', 'running')]
+
+    def pending(self):
+        """Number of queued and running jobs"""
+        with self.lock:
+            return self._pending()
+
+    def _pending(self):
+        return sum(1 for job in self.jobs.values()
+                   if job['status'] in ('queued', 'running'))
+
+    def submit(self, func, *args):
+        job_id = uuid.uuid4().hex
+        with self.lock:
+            self._prune()
+            if self._pending() >= self.max_pending:
+                raise RuntimeError("Job queue is full")
+            self.jobs[job_id] = {
+                'status': 'queued',
+                'result': None,
+                'error': None,
+                'created': time.time()
+            }
+            self.futures[job_id] = self.executor.submit(self._run, job_id,
+                                                        func, *args)
+        return job_id
+
+    def _run(self, job_id, func, *args):
+        self._update(job_id, status='running')
+        try:
+            self._update(job_id, status='done', result=func(*args))
+        except Exception as e:
+            logger.error(f"Background job {job_id} failed: {e}")
+            self._update(job_id, status='error', error=str(e))
+
+    def _update(self, job_id, **fields):
+        with self.lock:
+            if job_id in self.jobs:
+                self.jobs[job_id].update(fields)
+
+    def _prune(self):
+        """Drop finished jobs nobody collected within max_age seconds"""
+        cutoff = time.time() - self.max_age
+        for job_id in [j for j, job in self.jobs.items()
+                       if job['status'] in ('done', 'error')
+                       and job['created'] < cutoff]:
+            del self.jobs[job_id]
+            del self.futures[job_id]
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def future(self, job_id):
+        """Future that completes when the job has finished, for waiting callers"""
+        with self.lock:
+            return self.futures.get(job_id)
+
+
+class RecorderRegistry:
+    """One AudioRecorder per browser session with idle eviction"""
 
+    def __init__(self, max_recordings=4, idle_seconds=1800):
+        self.recorders = {}
+        self.last_used = {}
+        self.max_recordings = max_recordings
+        self.idle_seconds = idle_seconds
+        # Sessions whose input device is being opened, counted as recording
+        self.starting = set()
+        self.lock = threading.Lock()
 
-# Initialize global audio recorder
-audio_recorder = AudioRecorder()
+    def get(self, session_id):
+        with self.lock:
+            stale = self._evict()
+            recorder = self.recorders.get(session_id)
+            if recorder is None:
+                recorder = self.recorders[session_id] = AudioRecorder()
+            self.last_used[session_id] = time.time()
+        # Closing joins threads, so it must not block other sessions
+        for old in stale:
+            old.close()
+        return recorder
+
+    def start(self, session_id, streaming=False):
+        """Start recording for a session unless the concurrency cap is hit"""
+        recorder = self.get(session_id)
+        with self.lock:
+            if recorder.is_recording or session_id in self.starting:
+                return False
+            active = sum(1 for other, r in self.recorders.items()
+                         if r.is_recording or other in self.starting)
+            if active >= self.max_recordings:
+                raise RuntimeError("Too many concurrent recordings")
+            self.starting.add(session_id)
+        # The slot is reserved, so a slow device open blocks no other session
+        try:
+            return recorder.start_recording(streaming=streaming)
+        finally:
+            with self.lock:
+                self.starting.discard(session_id)
+
+    def _evict(self):
+        """Remove idle recorders and return them; takes in progress are kept"""
+        cutoff = time.time() - self.idle_seconds
+        stale = []
+        for session_id in [s for s, used in self.last_used.items()
+                           if used < cutoff
+                           and not self.recorders[s].is_recording]:
+            stale.append(self.recorders.pop(session_id))
+            del self.last_used[session_id]
+        return stale
+
+
+# Initialize transcription queue and per-session recorders
+transcription_jobs = BackgroundJobs(
+    "transcribe",
+    max_workers=int(os.environ.get("TRANSCRIPTION_WORKERS", "1")),
+    max_pending=int(os.environ.get("TRANSCRIPTION_QUEUE_SIZE", "8")))
+stream_slots = threading.BoundedSemaphore(STREAM_SLOTS)
+recorder_registry = RecorderRegistry(
+    max_recordings=int(os.environ.get("MAX_RECORDINGS", "4")),
+    idle_seconds=int(os.environ.get("RECORDER_IDLE_SECONDS", "1800")))
+
+
+def browser_session_id():
+    """Stable ID for the requesting browser session"""
+    if 'browser_id' not in session:
+        session['browser_id'] = uuid.uuid4().hex
+    return session['browser_id']
+
+
+def current_recorder():
+    """AudioRecorder belonging to the requesting browser session"""
+    return recorder_registry.get(browser_session_id())
 
 # Configuration
 VIDEO_DIRECTORY = os.environ.get("VIDEO_DIRECTORY", r"./videos")
+# Further roots browsers may switch to, separated by os.pathsep; when unset
+# only VIDEO_DIRECTORY is served
+LIBRARY_ROOTS = [path for path in
+                 os.environ.get("LIBRARY_ROOTS", "").split(os.pathsep) if path]
 UPLOAD_FOLDER = os.environ.get("UPLOAD_FOLDER", "./uploads")
 ALLOWED_EXTENSIONS = {'vtt'}
+SEARCH_PAGE_SIZE = 24
 USAGE_DATA_FILE = "usage_data.json"
+USAGE_DB = "usage_data.db"
 ARCHIVE_FILE = "transcription_archive.json"
+ARCHIVE_DB = "transcription_archive.db"
+ARCHIVE_PAGE_SIZE = 20
+LIBRARY_INDEX_FILE = "library_index.json"
+SUBTITLE_INDEX_DB = "subtitle_index.db"
+TRANSLATION_CACHE_DB = "translation_cache.db"
+DICTIONARY_CACHE_DB = "dictionary_cache.db"
+# Video delivery: "x-accel" (nginx) or "x-sendfile" (Apache/lighttpd) hands
+# file bodies to the front proxy instead of streaming them from Python. For
+# nginx, VIDEO_ACCEL_PREFIX must be an internal location aliased to the library
+VIDEO_SENDFILE = os.environ.get("VIDEO_SENDFILE", "").lower()
+VIDEO_ACCEL_PREFIX = os.environ.get("VIDEO_ACCEL_PREFIX", "/protected-videos")
+VIDEO_MAX_AGE = int(os.environ.get("VIDEO_MAX_AGE", 86400))
+ASSET_MAX_AGE = 365 * 24 * 3600
+SIDECAR_EXTENSIONS = {'.vtt', '.jpg', '.jpeg', '.png', '.webp'}
 
 # Ensure directories exist
 os.makedirs(VIDEO_DIRECTORY, exist_ok=True)
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-def load_archive():
-    """Load archive data from file"""
-    try:
-        if os.path.exists(ARCHIVE_FILE):
-            with open(ARCHIVE_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-    except Exception as e:
-        logger.error(f"Error loading archive data: {e}")
-    return []
 
-def save_archive(data):
-    """Save archive data to file"""
+@contextmanager
+def connect_db(db_path):
+    """SQLite connection in WAL mode that commits on success and closes"""
+    db = sqlite3.connect(db_path, timeout=30)
     try:
-        with open(ARCHIVE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        logger.error(f"Error saving archive data: {e}")
+        db.execute('PRAGMA journal_mode=WAL')
+        with db:
+            yield db
+    finally:
+        db.close()
+
+
+def html_to_text(markup):
+    """Plain text of an HTML fragment, for indexing"""
+    markup = re.sub(r'<br\s*/?>|</(p|div|li)>', ' ', markup or '', flags=re.I)
+    return ' '.join(html.unescape(re.sub(r'<[^>]+>', ' ', markup)).split())
+
+
+class ArchiveStore:
+    """SQLite transcription archive with stable, never-reused entry IDs.
+
+    The text of every entry is stripped of HTML once, on write, and kept in
+    an FTS5 table for searching.
+    """
+
+    FIELDS = ('transcription_html', 'improved_html', 'hint_html')
+
+    def __init__(self, db_path, legacy_file=None):
+        self.db_path = db_path
+        with connect_db(self.db_path) as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS archive (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    date TEXT NOT NULL,
+                    video_name TEXT NOT NULL,
+                    transcription_html TEXT NOT NULL,
+                    improved_html TEXT NOT NULL,
+                    hint_html TEXT NOT NULL
+                )
+            """)
+            db.executescript("""
+                CREATE INDEX IF NOT EXISTS archive_video ON archive(video_name);
+                CREATE INDEX IF NOT EXISTS archive_date ON archive(date);
+                CREATE VIRTUAL TABLE IF NOT EXISTS archive_text USING fts5(
+                    transcription, improved, hint,
+                    tokenize='unicode61 remove_diacritics 2'
+                );
+            """)
+            has_entries = db.execute('SELECT 1 FROM archive LIMIT 1').fetchone()
+            indexed = db.execute('SELECT COUNT(*) FROM archive_text').fetchone()[0]
+            if has_entries and not indexed:
+                self._reindex(db)
+        if not has_entries and legacy_file and os.path.exists(legacy_file):
+            self._import_json(legacy_file)
+
+    def _import_json(self, legacy_file):
+        """One-time import of transcription_archive.json in its original order"""
+        try:
+            with open(legacy_file, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+            # Existing rows mark the import as done, so it is all-or-nothing:
+            # after a crash the archive is still empty and the import reruns
+            with connect_db(self.db_path) as db:
+                for entry in legacy:
+                    self._insert(db, entry.get('video_name', ''),
+                                 {field: entry.get(field, '') for field in self.FIELDS},
+                                 date=entry.get('date'))
+            logger.info(f"Imported {len(legacy)} archive entries from {legacy_file}")
+        except Exception as e:
+            logger.error(f"Error importing archive data: {e}")
+
+    def _index(self, db, entry_id, fields):
+        db.execute('DELETE FROM archive_text WHERE rowid = ?', (entry_id, ))
+        db.execute(
+            'INSERT INTO archive_text (rowid, transcription, improved, hint) '
+            'VALUES (?, ?, ?, ?)',
+            (entry_id, *(html_to_text(fields[field]) for field in self.FIELDS)))
+
+    def _reindex(self, db):
+        """Build the search index for entries written before it existed"""
+        db.row_factory = sqlite3.Row
+        for row in db.execute('SELECT * FROM archive').fetchall():
+            self._index(db, row['id'], row)
+        db.row_factory = None
+
+    @metrics.timed('store_operation_duration_seconds',
+                   store='archive', operation='add')
+    def add(self, video_name, fields, date=None):
+        """Insert an entry and return its ID"""
+        with connect_db(self.db_path) as db:
+            return self._insert(db, video_name, fields, date)
+
+    def _insert(self, db, video_name, fields, date=None):
+        fields = {field: fields.get(field, '') for field in self.FIELDS}
+        cursor = db.execute(
+            'INSERT INTO archive (date, video_name, transcription_html, '
+            'improved_html, hint_html) VALUES (?, ?, ?, ?, ?)',
+            (date or datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+             video_name, *fields.values()))
+        self._index(db, cursor.lastrowid, fields)
+        return cursor.lastrowid
+
+    @metrics.timed('store_operation_duration_seconds',
+                   store='archive', operation='update')
+    def update(self, entry_id, fields):
+        """Update the given HTML fields; returns False for an unknown ID"""
+        fields = {k: v for k, v in fields.items() if k in self.FIELDS}
+        if not fields:
+            return False
+        assignments = ', '.join(f'{field} = ?' for field in fields)
+        with connect_db(self.db_path) as db:
+            cursor = db.execute(f'UPDATE archive SET {assignments} WHERE id = ?',
+                                (*fields.values(), entry_id))
+            if cursor.rowcount == 0:
+                return False
+            db.row_factory = sqlite3.Row
+            row = db.execute('SELECT * FROM archive WHERE id = ?',
+                             (entry_id, )).fetchone()
+            self._index(db, entry_id, row)
+            return True
+
+    @metrics.timed('store_operation_duration_seconds',
+                   store='archive', operation='delete')
+    def delete(self, entry_id):
+        with connect_db(self.db_path) as db:
+            db.execute('DELETE FROM archive_text WHERE rowid = ?', (entry_id, ))
+            return db.execute('DELETE FROM archive WHERE id = ?',
+                              (entry_id, )).rowcount > 0
+
+    @metrics.timed('store_operation_duration_seconds',
+                   store='archive', operation='search')
+    def search(self, query='', video_name=None, date_from=None, date_to=None,
+               limit=20, offset=0):
+        """Ranked matches with highlighted snippets; returns (hits, total)"""
+        conditions = []
+        params = []
+        if video_name:
+            conditions.append('archive.video_name = ?')
+            params.append(video_name)
+        if date_from:
+            conditions.append('archive.date >= ?')
+            params.append(date_from)
+        if date_to:
+            conditions.append('archive.date <= ?')
+            params.append(f"{date_to} 23:59:59")
+
+        # Every word must match; the last one may be a prefix
+        tokens = re.findall(r'[^\W_]+', query.lower())
+        with connect_db(self.db_path) as db:
+            if tokens:
+                match = ' '.join(f'"{token}"' for token in tokens) + '*'
+                where = ' AND '.join(['archive_text MATCH ?'] + conditions)
+                sql_from = ('FROM archive_text JOIN archive '
+                            'ON archive.id = archive_text.rowid '
+                            f'WHERE {where}')
+                params = [match] + params
+                # \x02/\x03 mark matches until the snippet is HTML-escaped
+                select = ("SELECT archive.id, archive.date, archive.video_name, "
+                          "snippet(archive_text, -1, char(2), char(3), '…', 16) "
+                          f"{sql_from} ORDER BY bm25(archive_text, 1.0, 2.0, 1.0)")
+            else:
+                where = ' AND '.join(conditions) or '1'
+                sql_from = f'FROM archive WHERE {where}'
+                select = ("SELECT archive.id, archive.date, archive.video_name, "
+                          "substr(archive_text.transcription, 1, 160) "
+                          "FROM archive JOIN archive_text "
+                          "ON archive_text.rowid = archive.id "
+                          f"WHERE {where} ORDER BY archive.id DESC")
+
+            total = db.execute(f'SELECT COUNT(*) {sql_from}', params).fetchone()[0]
+            rows = db.execute(f'{select} LIMIT ? OFFSET ?',
+                              params + [limit, offset]).fetchall()
+
+        hits = [{
+            'id': entry_id,
+            'date': date,
+            'video_name': video_name,
+            'snippet': html.escape(snippet or '').replace('\x02', '<mark>').replace(
+                '\x03', '</mark>')
+        } for entry_id, date, video_name, snippet in rows]
+        return hits, total
+
+    @metrics.timed('store_operation_duration_seconds',
+                   store='archive', operation='page')
+    def page(self, before=None, after=None, limit=ARCHIVE_PAGE_SIZE):
+        """Entries in ID order around a cursor; the newest page by default.
+
+        Returns (entries, has_older, has_newer).
+        """
+        columns = 'id, date, video_name, transcription_html, improved_html, hint_html'
+        with connect_db(self.db_path) as db:
+            db.row_factory = sqlite3.Row
+            if after is not None:
+                rows = db.execute(
+                    f'SELECT {columns} FROM archive WHERE id > ? '
+                    f'ORDER BY id LIMIT ?', (after, limit)).fetchall()
+            else:
+                rows = db.execute(
+                    f'SELECT {columns} FROM archive WHERE id < ? '
+                    f'ORDER BY id DESC LIMIT ?',
+                    (before if before is not None else sys.maxsize,
+                     limit)).fetchall()[::-1]
+            entries = [dict(row) for row in rows]
+            if not entries:
+                return [], False, False
+            has_older = db.execute('SELECT 1 FROM archive WHERE id < ? LIMIT 1',
+                                   (entries[0]['id'], )).fetchone() is not None
+            has_newer = db.execute('SELECT 1 FROM archive WHERE id > ? LIMIT 1',
+                                   (entries[-1]['id'], )).fetchone() is not None
+        return entries, has_older, has_newer
+
+
+archive_store = ArchiveStore(ARCHIVE_DB, legacy_file=ARCHIVE_FILE)
+
 
 @app.route('/archive')
 def archive():
     """Archive page showing saved transcriptions"""
-    archive_data = load_archive()
-    return render_template('archive.html', entries=archive_data)
+    entries, has_older, has_newer = archive_store.page(
+        before=request.args.get('before', type=int),
+        after=request.args.get('after', type=int))
+    return render_template('archive.html',
+                           entries=entries,
+                           has_older=has_older,
+                           has_newer=has_newer)
 
 @app.route('/api/archive', methods=['POST'])
 def save_to_archive():
     """API to save transcription to archive"""
     try:
         data = request.get_json()
-        archive_data = load_archive()
-        
-        new_entry = {
-            'id': len(archive_data),
-            'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'video_name': data.get('video_name', ''),
-            'transcription_html': data.get('transcription_html', ''),
-            'improved_html': data.get('improved_html', ''),
-            'hint_html': data.get('hint_html', '')
-        }
-        
-        archive_data.append(new_entry)
-        save_archive(archive_data)
-        return jsonify({'success': True})
+        entry_id = archive_store.add(
+            data.get('video_name', ''),
+            {field: data.get(field, '') for field in ArchiveStore.FIELDS})
+        return jsonify({'success': True, 'id': entry_id})
     except Exception as e:
         logger.error(f"Error saving to archive: {e}")
         return jsonify({'success': False, 'error': str(e)})
@@ -197,31 +1123,37 @@ def update_archive():
     """API to update archive entry"""
     try:
         data = request.get_json()
-        archive_data = load_archive()
-        
-        for entry in archive_data:
-            if str(entry['id']) == str(data['id']):
-                entry['transcription_html'] = data['transcription_html']
-                entry['improved_html'] = data['improved_html']
-                entry['hint_html'] = data['hint_html']
-                break
-                
-        save_archive(archive_data)
+        fields = {field: data[field] for field in ArchiveStore.FIELDS
+                  if field in data}
+        if not archive_store.update(int(data['id']), fields):
+            return jsonify({'success': False, 'error': 'Entry not found'})
         return jsonify({'success': True})
     except Exception as e:
         logger.error(f"Error updating archive: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/archive/search')
+def search_archive():
+    """API to search the archive by text, video and date range"""
+    try:
+        hits, total = archive_store.search(
+            request.args.get('q', ''),
+            video_name=request.args.get('video') or None,
+            date_from=request.args.get('from') or None,
+            date_to=request.args.get('to') or None,
+            limit=min(request.args.get('limit', 20, type=int), 100),
+            offset=request.args.get('offset', 0, type=int))
+        return jsonify({'success': True, 'hits': hits, 'total': total})
+    except Exception as e:
+        logger.error(f"Error searching archive: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
 @app.route('/api/archive/delete', methods=['POST'])
 def delete_archive():
     """API to delete archive entry"""
     try:
         data = request.get_json()
-        archive_data = load_archive()
-        
-        archive_data = [entry for entry in archive_data if str(entry['id']) != str(data['id'])]
-        
-        save_archive(archive_data)
+        archive_store.delete(int(data['id']))
         return jsonify({'success': True})
     except Exception as e:
         logger.error(f"Error deleting from archive: {e}")
@@ -235,115 +1167,643 @@ def allowed_file(filename):
         '.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
-def get_video_files(current_dir=None, search_query=None):
+VIDEO_EXTENSIONS = {'.mp4', '.webm', '.ogg', '.mov', '.mkv'}
+
+
+class DirectoryIndex:
+    """In-memory directory listings, invalidated by the directory's mtime"""
+
+    def __init__(self, max_dirs=256):
+        self.listings = OrderedDict()
+        self.max_dirs = max_dirs
+        self.lock = threading.Lock()
+
+    @metrics.timed('store_operation_duration_seconds',
+                   store='directory', operation='scan')
+    def scan(self, directory):
+        """Return (folders, files) for a directory with a single scandir pass"""
+        key = os.path.abspath(directory)
+        mtime = os.stat(key).st_mtime_ns
+        with self.lock:
+            cached = self.listings.get(key)
+            if cached and cached[0] == mtime:
+                self.listings.move_to_end(key)
+                return cached[1], cached[2]
+
+        folders = []
+        files = []
+        with os.scandir(key) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    folders.append(entry.name)
+                elif entry.is_file():
+                    files.append(entry.name)
+
+        with self.lock:
+            self.listings[key] = (mtime, folders, files)
+            self.listings.move_to_end(key)
+            while len(self.listings) > self.max_dirs:
+                self.listings.popitem(last=False)
+        return folders, files
+
+    def invalidate(self, directory):
+        with self.lock:
+            self.listings.pop(os.path.abspath(directory), None)
+
+
+directory_index = DirectoryIndex()
+
+
+def get_video_files(root, current_dir=None, search_query=None):
     """Scan directory for video files and folders"""
     videos = []
     folders = []
-    valid_extensions = ['.mp4', '.webm', '.ogg', '.mov', '.mkv']
 
-    scan_dir = current_dir if current_dir else VIDEO_DIRECTORY
-    rel_path = os.path.relpath(scan_dir,
-                               VIDEO_DIRECTORY) if current_dir else ''
+    scan_dir = current_dir if current_dir else root
+    rel_path = os.path.relpath(scan_dir, root) if current_dir else ''
 
     try:
-        for item in os.listdir(scan_dir):
-            filepath = os.path.join(scan_dir, item)
-            if os.path.isdir(filepath):
-                # Normalize path separators to forward slashes
-                clean_path = os.path.join(rel_path, item).replace('\\', '/')
-                # Remove leading ./ if present
-                if clean_path.startswith('./'):
-                    clean_path = clean_path[2:]
-                folders.append({'name': item, 'path': clean_path})
-            elif os.path.isfile(filepath):
-                ext = os.path.splitext(item)[1].lower()
-                if ext in valid_extensions and (not search_query or search_query.lower() in item.lower()):
-                    basename = os.path.splitext(item)[0]
-
-                    # Check for subtitle and thumbnail files
-                    subtitle_path = os.path.join(scan_dir,
-                                                 f"{basename}-subtitles.vtt")
-                    thumbnail_path = os.path.join(
-                        scan_dir, f"{basename}-thumbnails.vtt")
-
-                    # Check for cover image
-                    cover_path = f"{basename}.jpg"
-                    has_cover = os.path.isfile(
-                        os.path.join(scan_dir, cover_path))
-
-                    videos.append({
-                        'name':
-                        item,
-                        'path':
-                        os.path.join(rel_path, item),
-                        'has_subtitles':
-                        os.path.isfile(subtitle_path),
-                        'has_thumbnails':
-                        os.path.isfile(thumbnail_path),
-                        'basename':
-                        basename,
-                        'has_cover':
-                        has_cover,
-                        'cover_path':
-                        os.path.join(rel_path, cover_path)
-                        if has_cover else None
-                    })
-
+        folder_names, file_names = directory_index.scan(scan_dir)
     except Exception as e:
         logger.error(f"Error scanning directory: {e}")
         return {'videos': [], 'folders': []}
 
+    for item in folder_names:
+        # Normalize path separators to forward slashes
+        clean_path = os.path.join(rel_path, item).replace('\\', '/')
+        # Remove leading ./ if present
+        if clean_path.startswith('./'):
+            clean_path = clean_path[2:]
+        folders.append({'name': item, 'path': clean_path})
+
+    # Sidecar files are resolved against the listing instead of extra stats
+    present = set(file_names)
+    for item in file_names:
+        if os.path.splitext(item)[1].lower() not in VIDEO_EXTENSIONS:
+            continue
+        if search_query and search_query.lower() not in item.lower():
+            continue
+        videos.append(describe_video(item, rel_path, present))
+
     return {'videos': videos, 'folders': folders}
 
 
-def load_usage_data():
-    """Load usage data from file"""
+def describe_video(item, rel_path, present):
+    """Video listing entry; present is the set of file names in its folder"""
+    basename = os.path.splitext(item)[0]
+    cover_path = f"{basename}.jpg"
+    has_cover = cover_path in present
+
+    return {
+        'name': item,
+        'path': os.path.join(rel_path, item),
+        'has_subtitles': f"{basename}-subtitles.vtt" in present,
+        'has_thumbnails': f"{basename}-thumbnails.vtt" in present,
+        'basename': basename,
+        'has_cover': has_cover,
+        'cover_path': os.path.join(rel_path, cover_path) if has_cover else None
+    }
+
+
+def tokenize_name(text):
+    return re.findall(r'[^\W_]+', text.lower())
+
+
+class LibrarySearchIndex:
+    """Persisted token index over every video below a library root.
+
+    A background thread re-stats each directory periodically and rescans
+    only those whose mtime changed, so queries never walk the tree.
+    """
+
+    def __init__(self, root, interval=60):
+        self.root = root
+        self.interval = interval
+        self.dirs = {}
+        self.videos = {}
+        self.postings = {}
+        self.sorted_tokens = []
+        self.tokens_dirty = False
+        self.ready = threading.Event()
+        self.lock = threading.Lock()
+
+    def start(self):
+        persisted = load_library_index().get(os.path.abspath(self.root))
+        if persisted:
+            with self.lock:
+                for rel_dir, entry in persisted.items():
+                    self._replace_dir(rel_dir, entry)
+            self.ready.set()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing library index: {e}")
+            self.ready.set()
+            time.sleep(self.interval)
+
+    def refresh(self):
+        """Rescan directories whose mtime changed since the last pass"""
+        seen = set()
+        changed = False
+        stack = ['.']
+        while stack:
+            rel_dir = stack.pop()
+            abs_dir = os.path.normpath(os.path.join(self.root, rel_dir))
+            try:
+                mtime = os.stat(abs_dir).st_mtime_ns
+                entry = self.dirs.get(rel_dir)
+                if not entry or entry['mtime'] != mtime:
+                    folders, files = directory_index.scan(abs_dir)
+                    entry = {'mtime': mtime, 'folders': folders, 'files': files}
+                    with self.lock:
+                        self._replace_dir(rel_dir, entry)
+                    changed = True
+            except OSError as e:
+                logger.error(f"Error indexing directory {abs_dir}: {e}")
+                continue
+            seen.add(rel_dir)
+            for folder in entry['folders']:
+                stack.append(folder if rel_dir == '.' else f"{rel_dir}/{folder}")
+
+        removed = set(self.dirs) - seen
+        if removed:
+            with self.lock:
+                for rel_dir in removed:
+                    self._replace_dir(rel_dir, None)
+            changed = True
+        if changed:
+            save_library_index(os.path.abspath(self.root), self.dirs)
+
+    def _replace_dir(self, rel_dir, entry):
+        old = self.dirs.pop(rel_dir, None)
+        if old:
+            for item in old['files']:
+                path = os.path.join(rel_dir, item)
+                if self.videos.pop(path, None) is not None:
+                    for token in tokenize_name(os.path.splitext(item)[0]):
+                        postings = self.postings.get(token)
+                        if postings is not None:
+                            postings.discard(path)
+                            if not postings:
+                                del self.postings[token]
+        if entry:
+            self.dirs[rel_dir] = entry
+            present = set(entry['files'])
+            for item in entry['files']:
+                if os.path.splitext(item)[1].lower() not in VIDEO_EXTENSIONS:
+                    continue
+                video = describe_video(item, rel_path=rel_dir, present=present)
+                self.videos[video['path']] = video
+                for token in tokenize_name(video['basename']):
+                    self.postings.setdefault(token, set()).add(video['path'])
+        self.tokens_dirty = True
+
+    def search(self, query, page=1, per_page=24):
+        """Ranked prefix/token matches; returns (videos on page, total hits)"""
+        terms = tokenize_name(query)
+        if not terms:
+            return [], 0
+        self.ready.wait(timeout=10)
+
+        with self.lock:
+            if self.tokens_dirty:
+                self.sorted_tokens = sorted(self.postings)
+                self.tokens_dirty = False
+
+            # Every term has to match a token; exact tokens outrank prefixes
+            scores = None
+            for term in terms:
+                term_scores = {}
+                i = bisect.bisect_left(self.sorted_tokens, term)
+                while (i < len(self.sorted_tokens)
+                       and self.sorted_tokens[i].startswith(term)):
+                    token = self.sorted_tokens[i]
+                    weight = 3 if token == term else 1
+                    for path in self.postings[token]:
+                        term_scores[path] = max(term_scores.get(path, 0),
+                                                weight)
+                    i += 1
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {path: score + term_scores[path]
+                              for path, score in scores.items()
+                              if path in term_scores}
+                if not scores:
+                    return [], 0
+
+            phrase = query.lower().strip()
+            for path in scores:
+                if phrase in self.videos[path]['name'].lower():
+                    scores[path] += 2
+            ranked = sorted(scores,
+                            key=lambda p: (-scores[p],
+                                           len(self.videos[p]['name']), p))
+            start = (max(page, 1) - 1) * per_page
+            return ([dict(self.videos[p])
+                     for p in ranked[start:start + per_page]], len(ranked))
+
+
+library_indexes = {}
+library_indexes_lock = threading.Lock()
+
+
+def get_library_index(root):
+    """Search index for a library root, built in the background on first use"""
+    key = os.path.abspath(root)
+    with library_indexes_lock:
+        index = library_indexes.get(key)
+        if index is None:
+            index = library_indexes[key] = LibrarySearchIndex(
+                root, interval=int(os.environ.get("LIBRARY_INDEX_INTERVAL",
+                                                  "60")))
+            index.start()
+        return index
+
+
+class LibraryRoots:
+    """Registry of library roots; the selected one lives in the request context
+
+    Each request resolves its root from the browser's cookie (see
+    load_last_directory), so concurrent requests and workers never share
+    or overwrite a process-wide root.
+    """
+
+    def __init__(self, default, allowed=()):
+        self.default = os.path.abspath(default)
+        # Only these roots are served and indexed, which also bounds the
+        # number of background indexer threads
+        self.allowed = {os.path.abspath(path) for path in allowed} | {self.default}
+        self.registered = set()
+        self.lock = threading.Lock()
+
+    def is_allowed(self, path):
+        return bool(path) and os.path.abspath(path) in self.allowed
+
+    def resolve(self, directory):
+        """Absolute path of an allowed, existing root, or None"""
+        if not directory or not self.is_allowed(directory):
+            return None
+        path = os.path.abspath(directory)
+        return path if os.path.isdir(path) else None
+
+    def register(self, root):
+        """Start the background file-name and subtitle indexes of a root once"""
+        if not self.is_allowed(root):
+            raise ValueError(f"Library root not allowed: {root}")
+        with self.lock:
+            if root in self.registered:
+                return
+            self.registered.add(root)
+        get_library_index(root)
+        subtitle_index.watch(root)
+
+
+library_roots = LibraryRoots(VIDEO_DIRECTORY, allowed=LIBRARY_ROOTS)
+
+
+@metrics.timed('store_operation_duration_seconds',
+               store='library_index', operation='load')
+def load_library_index():
+    """Load persisted directory listings for every indexed root"""
     try:
-        if os.path.exists(USAGE_DATA_FILE):
-            with open(USAGE_DATA_FILE, 'r') as f:
+        if os.path.exists(LIBRARY_INDEX_FILE):
+            with open(LIBRARY_INDEX_FILE, 'r', encoding='utf-8') as f:
                 return json.load(f)
     except Exception as e:
-        logger.error(f"Error loading usage data: {e}")
-
+        logger.error(f"Error loading library index: {e}")
     return {}
 
 
-def save_usage_data(data):
-    """Save usage data to file"""
+library_index_file_lock = threading.Lock()
+
+
+@metrics.timed('store_operation_duration_seconds',
+               store='library_index', operation='save')
+def save_library_index(root, dirs):
+    """Persist the directory listings of one root"""
     try:
-        with open(USAGE_DATA_FILE, 'w') as f:
-            json.dump(data, f)
+        with library_index_file_lock:
+            # Listings of roots that are no longer allowed are dropped
+            data = {path: listing for path, listing in load_library_index().items()
+                    if library_roots.is_allowed(path)}
+            data[root] = dirs
+            tmp_path = f"{LIBRARY_INDEX_FILE}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, LIBRARY_INDEX_FILE)
     except Exception as e:
-        logger.error(f"Error saving usage data: {e}")
+        logger.error(f"Error saving library index: {e}")
+
+
+class UsageStore:
+    """SQLite usage log: one row per tracked interval plus rollup tables.
+
+    Each update is a single transaction that appends the event and bumps
+    the daily, weekly and monthly totals, the overall summary and the run
+    of consecutive active days, so concurrent updates never lose time and
+    statistics queries never have to scan the history.
+    """
+
+    def __init__(self, db_path, legacy_file=None):
+        self.db_path = db_path
+        with connect_db(self.db_path) as db:
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS usage_events (
+                    id INTEGER PRIMARY KEY,
+                    date TEXT NOT NULL,
+                    seconds INTEGER NOT NULL,
+                    session_id TEXT,
+                    video TEXT,
+                    recorded REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS usage_events_date ON usage_events(date);
+                CREATE TABLE IF NOT EXISTS usage_daily (
+                    date TEXT PRIMARY KEY,
+                    seconds INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS usage_weekly (
+                    week TEXT PRIMARY KEY,
+                    seconds INTEGER NOT NULL,
+                    days INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS usage_monthly (
+                    month TEXT PRIMARY KEY,
+                    seconds INTEGER NOT NULL,
+                    days INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS usage_summary (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    total_seconds INTEGER NOT NULL,
+                    active_days INTEGER NOT NULL,
+                    first_date TEXT NOT NULL,
+                    max_daily_seconds INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS usage_runs (
+                    start TEXT PRIMARY KEY,
+                    end TEXT NOT NULL UNIQUE,
+                    length INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS usage_runs_length ON usage_runs(length);
+            """)
+            has_daily = db.execute('SELECT 1 FROM usage_daily LIMIT 1').fetchone()
+            has_summary = db.execute('SELECT 1 FROM usage_summary').fetchone()
+            if has_daily and not has_summary:
+                self._rebuild_rollups(db)
+        if not has_daily and legacy_file and os.path.exists(legacy_file):
+            self._import_json(legacy_file)
+
+    def _import_json(self, legacy_file):
+        """One-time import of the old {date: seconds} usage_data.json"""
+        try:
+            with open(legacy_file, 'r') as f:
+                legacy = json.load(f)
+            # Existing days mark the import as done, so it is all-or-nothing:
+            # after a crash the store is still empty and the import reruns
+            with connect_db(self.db_path) as db:
+                for date, seconds in sorted(legacy.items()):
+                    self._record(db, date, seconds, session_id='import')
+            logger.info(f"Imported {len(legacy)} days from {legacy_file}")
+        except Exception as e:
+            logger.error(f"Error importing usage data: {e}")
+
+    def _rebuild_rollups(self, db):
+        """Derive every rollup from usage_daily (for databases without them)"""
+        days = db.execute('SELECT date, seconds FROM usage_daily '
+                          'WHERE seconds > 0 ORDER BY date').fetchall()
+        db.execute('DELETE FROM usage_daily')
+        for date, seconds in days:
+            self._add(db, date, seconds)
+
+    @metrics.timed('store_operation_duration_seconds',
+                   store='usage', operation='record')
+    def record(self, date, seconds, session_id=None, video=None):
+        if seconds <= 0:
+            return
+        with connect_db(self.db_path) as db:
+            self._record(db, date, seconds, session_id, video)
+
+    def _record(self, db, date, seconds, session_id=None, video=None):
+        if seconds <= 0:
+            return
+        db.execute(
+            'INSERT INTO usage_events (date, seconds, session_id, video, recorded) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (date, seconds, session_id, video, time.time()))
+        self._add(db, date, seconds)
+
+    def _add(self, db, date, seconds):
+        day = datetime.strptime(date, '%Y-%m-%d').date()
+        previous = db.execute('SELECT seconds FROM usage_daily WHERE date = ?',
+                              (date, )).fetchone()
+        new_day = 1 if previous is None else 0
+        daily = seconds + (previous[0] if previous else 0)
+        db.execute(
+            'INSERT INTO usage_daily (date, seconds) VALUES (?, ?) '
+            'ON CONFLICT(date) DO UPDATE SET seconds = excluded.seconds',
+            (date, daily))
+
+        iso_year, iso_week, _ = day.isocalendar()
+        db.execute(
+            'INSERT INTO usage_weekly (week, seconds, days) VALUES (?, ?, ?) '
+            'ON CONFLICT(week) DO UPDATE SET seconds = seconds + excluded.seconds, '
+            'days = days + excluded.days',
+            (f"{iso_year}-W{iso_week:02d}", seconds, new_day))
+        db.execute(
+            'INSERT INTO usage_monthly (month, seconds, days) VALUES (?, ?, ?) '
+            'ON CONFLICT(month) DO UPDATE SET seconds = seconds + excluded.seconds, '
+            'days = days + excluded.days',
+            (date[:7], seconds, new_day))
+        db.execute(
+            'INSERT INTO usage_summary (id, total_seconds, active_days, first_date, '
+            'max_daily_seconds) VALUES (1, ?, ?, ?, ?) '
+            'ON CONFLICT(id) DO UPDATE SET '
+            'total_seconds = total_seconds + excluded.total_seconds, '
+            'active_days = active_days + excluded.active_days, '
+            'first_date = MIN(first_date, excluded.first_date), '
+            'max_daily_seconds = MAX(max_daily_seconds, excluded.max_daily_seconds)',
+            (seconds, new_day, date, daily))
+
+        if new_day:
+            self._extend_runs(db, day)
+
+    def _extend_runs(self, db, day):
+        """Merge a newly active day into the runs of consecutive days"""
+        start = end = day.isoformat()
+        before = db.execute('SELECT start FROM usage_runs WHERE end = ?',
+                            ((day - timedelta(days=1)).isoformat(), )).fetchone()
+        after = db.execute('SELECT end FROM usage_runs WHERE start = ?',
+                           ((day + timedelta(days=1)).isoformat(), )).fetchone()
+        if before:
+            start = before[0]
+            db.execute('DELETE FROM usage_runs WHERE start = ?', (start, ))
+        if after:
+            end = after[0]
+            db.execute('DELETE FROM usage_runs WHERE end = ?', (end, ))
+        length = (datetime.strptime(end, '%Y-%m-%d') -
+                  datetime.strptime(start, '%Y-%m-%d')).days + 1
+        db.execute('INSERT INTO usage_runs (start, end, length) VALUES (?, ?, ?)',
+                   (start, end, length))
+
+    @metrics.timed('store_operation_duration_seconds',
+                   store='usage', operation='day')
+    def day(self, date):
+        with connect_db(self.db_path) as db:
+            row = db.execute('SELECT seconds FROM usage_daily WHERE date = ?',
+                             (date, )).fetchone()
+        return row[0] if row else 0
+
+    @metrics.timed('store_operation_duration_seconds',
+                   store='usage', operation='daily_range')
+    def daily_range(self, start, end):
+        """{date: seconds} for start <= date <= end"""
+        with connect_db(self.db_path) as db:
+            return dict(db.execute(
+                'SELECT date, seconds FROM usage_daily '
+                'WHERE date BETWEEN ? AND ? ORDER BY date', (start, end)))
+
+    @metrics.timed('store_operation_duration_seconds',
+                   store='usage', operation='rollup')
+    def rollup(self, period, start, end):
+        """Weekly ('YYYY-Www') or monthly ('YYYY-MM') totals in a key range"""
+        table, key = {
+            'week': ('usage_weekly', 'week'),
+            'month': ('usage_monthly', 'month')
+        }[period]
+        with connect_db(self.db_path) as db:
+            return [{
+                'period': period_key,
+                'seconds': seconds,
+                'days': days
+            } for period_key, seconds, days in db.execute(
+                f'SELECT {key}, seconds, days FROM {table} '
+                f'WHERE {key} BETWEEN ? AND ? ORDER BY {key}', (start, end))]
+
+    @metrics.timed('store_operation_duration_seconds',
+                   store='usage', operation='summary')
+    def summary(self, today):
+        """Totals, averages, visit rate and streaks as of the given date"""
+        with connect_db(self.db_path) as db:
+            row = db.execute(
+                'SELECT total_seconds, active_days, first_date, max_daily_seconds '
+                'FROM usage_summary WHERE id = 1').fetchone()
+            longest = db.execute(
+                'SELECT MAX(length) FROM usage_runs').fetchone()[0] or 0
+            today_date = datetime.strptime(today, '%Y-%m-%d').date()
+            # The current streak is still alive if it ended today or yesterday
+            current = db.execute(
+                'SELECT length FROM usage_runs WHERE end IN (?, ?)',
+                (today, (today_date - timedelta(days=1)).isoformat())).fetchone()
+
+        if not row:
+            return {
+                'total_seconds': 0,
+                'active_days': 0,
+                'first_date': None,
+                'max_daily_seconds': 0,
+                'avg_daily_seconds': 0,
+                'visit_rate': 0,
+                'current_streak': 0,
+                'longest_streak': 0
+            }
+
+        total_seconds, active_days, first_date, max_daily_seconds = row
+        span = (today_date - datetime.strptime(first_date, '%Y-%m-%d').date()).days + 1
+        return {
+            'total_seconds': total_seconds,
+            'active_days': active_days,
+            'first_date': first_date,
+            'max_daily_seconds': max_daily_seconds,
+            'avg_daily_seconds': total_seconds / active_days,
+            'visit_rate': active_days / max(span, 1),
+            'current_streak': current[0] if current else 0,
+            'longest_streak': longest
+        }
+
+    @metrics.timed('store_operation_duration_seconds',
+                   store='usage', operation='daily_totals')
+    def daily_totals(self):
+        """Usage in the old {date: seconds} shape"""
+        with connect_db(self.db_path) as db:
+            return dict(db.execute(
+                'SELECT date, seconds FROM usage_daily ORDER BY date'))
+
+
+usage_store = UsageStore(USAGE_DB, legacy_file=USAGE_DATA_FILE)
 
 
 @app.route('/')
 @app.route('/folder/<path:folder_path>')
 def index(folder_path=None):
     """Home page with video and folder listing"""
-    current_dir = os.path.join(VIDEO_DIRECTORY,
-                               folder_path) if folder_path else VIDEO_DIRECTORY
-    if not os.path.exists(current_dir):
+    root = library_root()
+    library_roots.register(root)
+    # safe_join keeps folder paths from escaping the selected root
+    current_dir = safe_join(root, folder_path) if folder_path else root
+    if not current_dir or not os.path.exists(current_dir):
         flash("Ordner nicht gefunden", "error")
         return redirect(url_for('index'))
 
-    search_query = request.args.get('search', '')
-    result = get_video_files(current_dir, search_query)
+    search_query = request.args.get('search', '').strip()
+    if search_query:
+        # Search covers the whole library, not just the current folder
+        page = request.args.get('page', 1, type=int)
+        videos, total = get_library_index(root).search(
+            search_query, page=page, per_page=SEARCH_PAGE_SIZE)
+        subtitle_hits, _ = subtitle_index.search(root,
+                                                 search_query,
+                                                 limit=20)
+        return render_template('index.html',
+                               videos=videos,
+                               subtitle_hits=subtitle_hits,
+                               folders=[],
+                               current_path=folder_path if folder_path else '',
+                               video_directory=root,
+                               search_query=search_query,
+                               search_total=total,
+                               page=page,
+                               total_pages=max(1, -(-total // SEARCH_PAGE_SIZE)))
+
+    result = get_video_files(root, current_dir)
     return render_template('index.html',
                            videos=result['videos'],
                            folders=result['folders'],
                            current_path=folder_path if folder_path else '',
-                           video_directory=VIDEO_DIRECTORY)
+                           video_directory=root)
+
+
+@app.route('/api/search_videos')
+def search_videos():
+    """API to search the whole video library by file name"""
+    query = request.args.get('q', '')
+    page = request.args.get('page', 1, type=int)
+    per_page = min(request.args.get('per_page', SEARCH_PAGE_SIZE, type=int), 100)
+    videos, total = get_library_index(library_root()).search(
+        query, page=page, per_page=per_page)
+    return jsonify({
+        'success': True,
+        'videos': videos,
+        'total': total,
+        'page': page,
+        'per_page': per_page
+    })
 
 
 @app.route('/player/<path:video_name>')
 def player(video_name):
     """Video player page"""
     # Get the full path and directory
+    root = library_root()
     video_rel_path = video_name
-    video_dir = os.path.dirname(os.path.join(VIDEO_DIRECTORY, video_rel_path))
+    video_path = safe_join(root, video_rel_path)
+    if not video_path:
+        return redirect(url_for('index'))
 
-    result = get_video_files(video_dir)
+    result = get_video_files(root, os.path.dirname(video_path))
     video = next((v for v in result['videos'] if v['path'] == video_rel_path),
                  None)
 
@@ -355,13 +1815,81 @@ def player(video_name):
     video['basename'] = os.path.splitext(video_rel_path)[0].lstrip(
         '.\\').lstrip('.')
 
+    # Warm the dictionary cache for the words learners will hover over. Off
+    # by default: it scrapes duden.de once for every new word in the file
+    if video['has_subtitles'] and os.environ.get("DUDEN_PREFETCH", "0") == "1":
+        dictionary_cache.schedule_prefetch(
+            os.path.join(root, f"{video['basename']}-subtitles.vtt"))
+
     return render_template('player.html', video=video, videos=result['videos'])
 
 
+@app.context_processor
+def asset_helpers():
+    """Expose asset_url() so templates link sidecar files with a version"""
+    return {'asset_url': asset_url}
+
+
+def asset_url(rel_path):
+    """URL under /videos carrying the file's mtime, safe to cache forever"""
+    path = safe_join(library_root(), rel_path)
+    try:
+        version = format(os.stat(path).st_mtime_ns, 'x')
+    except (TypeError, OSError):
+        return url_for('serve_video', filename=rel_path)
+    return url_for('serve_video', filename=rel_path, v=version)
+
+
+def sendfile_response(path, root, max_age):
+    """Let the front proxy send the file body, ranges and validators"""
+    response = Response(mimetype=mimetypes.guess_type(path)[0]
+                        or 'application/octet-stream')
+    if VIDEO_SENDFILE == 'x-accel':
+        relative = os.path.relpath(path, root)
+        response.headers['X-Accel-Redirect'] = (
+            f"{VIDEO_ACCEL_PREFIX.rstrip('/')}/{quote(relative.replace(os.sep, '/'))}")
+    else:
+        response.headers['X-Sendfile'] = path
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    return response
+
+
 @app.route('/videos/<path:filename>')
 def serve_video(filename):
-    """Serve video files"""
-    return send_from_directory(VIDEO_DIRECTORY, filename)
+    """Serve video files and their sidecar assets"""
+    root = library_root()
+    path = safe_join(root, filename)
+    if path is None or not os.path.isfile(path):
+        return jsonify({'success': False, 'error': 'File not found'}), 404
+
+    # Versioned sidecar URLs change whenever the file does (see asset_url)
+    is_sidecar = os.path.splitext(path)[1].lower() in SIDECAR_EXTENSIONS
+    versioned = is_sidecar and 'v' in request.args
+    if versioned:
+        max_age = ASSET_MAX_AGE
+    elif is_sidecar:
+        max_age = 0
+    else:
+        max_age = VIDEO_MAX_AGE
+
+    if VIDEO_SENDFILE in ('x-accel', 'x-sendfile'):
+        response = sendfile_response(path, root, max_age)
+    else:
+        # conditional=True answers Range and If-None-Match itself; the body is
+        # a file wrapper, so servers with wsgi.file_wrapper use sendfile(2)
+        response = send_from_directory(root, filename,
+                                       conditional=True, etag=True,
+                                       max_age=max_age)
+        response.cache_control.public = True
+    if versioned:
+        response.cache_control.immutable = True
+    else:
+        # The same URL maps to another file once the browser switches roots
+        response.vary.add('Cookie')
+        if is_sidecar:
+            response.cache_control.no_cache = True
+    return response
 
 
 @app.route('/upload/<video_basename>/<file_type>', methods=['POST'])
@@ -376,10 +1904,14 @@ def upload_file(video_basename, file_type):
 
     if file and allowed_file(file.filename):
         filename = f"{video_basename}-{file_type}.vtt"
-        filepath = os.path.join(VIDEO_DIRECTORY, filename)
+        root = library_root()
+        filepath = os.path.join(root, filename)
 
         try:
             file.save(filepath)
+            directory_index.invalidate(root)
+            if file_type == 'subtitles':
+                subtitle_index.update_file(filepath, root)
             return jsonify({
                 'success':
                 True,
@@ -396,8 +1928,8 @@ def upload_file(video_basename, file_type):
 @app.route('/statistics')
 def statistics():
     """Statistics page"""
-    usage_data = load_usage_data()
-    return render_template('statistics.html', data=usage_data)
+    # Figures are fetched from the aggregated /api/usage endpoints
+    return render_template('statistics.html')
 
 
 @app.route('/api/update_usage', methods=['POST'])
@@ -405,17 +1937,13 @@ def update_usage():
     """API to update usage time data"""
     try:
         data = request.get_json()
-        usage_time = data.get('usage_time', 0)
+        usage_time = int(data.get('usage_time', 0))
         date = data.get('date', datetime.today().strftime('%Y-%m-%d'))
 
-        usage_data = load_usage_data()
-
-        if date not in usage_data:
-            usage_data[date] = 0
-
-        usage_data[date] += usage_time
-
-        save_usage_data(usage_data)
+        usage_store.record(date,
+                           usage_time,
+                           session_id=browser_session_id(),
+                           video=data.get('video'))
         return jsonify({'success': True})
     except Exception as e:
         logger.error(f"Error updating usage data: {e}")
@@ -425,25 +1953,105 @@ def update_usage():
 @app.route('/api/get_usage_data')
 def get_usage_data():
     """API to get usage time data"""
-    usage_data = load_usage_data()
+    usage_data = usage_store.daily_totals()
     return jsonify(usage_data)
 
 
+def usage_date_arg(name):
+    """Validated YYYY-MM-DD query argument, defaulting to today"""
+    value = request.args.get(name) or datetime.today().strftime('%Y-%m-%d')
+    datetime.strptime(value, '%Y-%m-%d')
+    return value
+
+
+@app.route('/api/usage/today')
+def get_usage_today():
+    """API to get the usage time of a single day"""
+    try:
+        date = usage_date_arg('date')
+        return jsonify({'success': True, 'date': date,
+                        'seconds': usage_store.day(date)})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/usage/range')
+def get_usage_range():
+    """API to get daily usage between two dates (inclusive)"""
+    try:
+        start = usage_date_arg('start')
+        end = usage_date_arg('end')
+        return jsonify({'success': True,
+                        'days': usage_store.daily_range(start, end)})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/usage/rollup/<period>')
+def get_usage_rollup(period):
+    """API to get weekly or monthly usage totals"""
+    if period not in ('week', 'month'):
+        return jsonify({'success': False, 'error': 'Unknown period'})
+    start = request.args.get('start', '0000')
+    end = request.args.get('end', '9999')
+    return jsonify({'success': True,
+                    'periods': usage_store.rollup(period, start, end)})
+
+
+@app.route('/api/usage/summary')
+def get_usage_summary():
+    """API to get totals, averages and streaks"""
+    try:
+        return jsonify({'success': True,
+                        'summary': usage_store.summary(usage_date_arg('today'))})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+
 @app.route('/api/audio/start', methods=['POST'])
 def start_audio():
     """Start audio recording"""
     try:
-        audio_recorder.start_recording()
+        data = request.get_json(silent=True) or {}
+        recorder_registry.start(browser_session_id(),
+                                streaming=bool(data.get('stream')))
         return jsonify({'success': True})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
 
+@app.route('/api/audio/stream')
+def stream_audio_transcription():
+    """Server-sent events with partial and final segments while recording"""
+    recorder = current_recorder()
+
+    def generate():
+        index = 0
+        while True:
+            events = recorder.stream_events_since(index)
+            thread = recorder.stream_thread
+            if not events and not (thread and thread.is_alive()):
+                return
+            if not events:
+                # Keep the connection alive through long pauses
+                yield ': keepalive\n\n'
+                continue
+            for event in events:
+                yield f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+                if event['type'] == 'done':
+                    return
+            index += len(events)
+
+    return Response(stream_with_context(generate()),
+                    mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
+
 @app.route('/api/audio/pause', methods=['POST'])
 def pause_audio():
     """Pause audio recording and get transcription"""
     try:
-        transcription = audio_recorder.pause_recording()
+        transcription = current_recorder().pause_recording()
         return jsonify({'success': True, 'transcription': transcription})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
@@ -453,17 +2061,37 @@ def pause_audio():
 def resume_audio():
     """Resume audio recording"""
     try:
-        audio_recorder.resume_recording()
+        current_recorder().resume_recording()
         return jsonify({'success': True})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
 
+@app.route('/api/audio/level')
+def audio_level():
+    """Live input level for the recording VU meter"""
+    recorder = current_recorder()
+    return jsonify({
+        'success': True,
+        'recording': recorder.is_recording,
+        'paused': recorder.is_paused,
+        'level': round(recorder.input_level(), 4)
+    })
+
+
 @app.route('/api/audio/transcribe', methods=['POST'])
 def transcribe_audio():
     """Transcribe the recorded audio"""
     try:
-        transcription = audio_recorder.transcribe_audio()
+        # Through the job queue, so Whisper runs stay bounded by its workers
+        recorder = current_recorder()
+        job_id = transcription_jobs.submit(recorder.transcribe_take,
+                                           recorder.last_take)
+        transcription_jobs.future(job_id).result()
+        job = transcription_jobs.get(job_id)
+        if job['status'] == 'error':
+            raise RuntimeError(job['error'])
+        transcription = job['result']
         return jsonify({
             'success': True,
             'transcription': transcription
@@ -471,19 +2099,44 @@ def transcribe_audio():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/audio/recording.wav')
+def recorded_audio():
+    """Encode the last recording as WAV for playback"""
+    return Response(current_recorder().recording_wav(),
+                    mimetype='audio/wav',
+                    headers={'Cache-Control': 'no-store'})
+
+
 @app.route('/api/audio/stop', methods=['POST'])
 def stop_audio():
     """Stop audio recording and get final transcription"""
     try:
-        result = audio_recorder.stop_recording()
+        result = current_recorder().stop_recording()
         return jsonify({
-            'success': True, 
-            'audio_path': result.get('audio_path', '')
+            'success': True,
+            'audio_path': result.get('audio_path', ''),
+            'job_id': result.get('job_id')
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
 
+@app.route('/api/audio/jobs/<job_id>')
+def transcription_job_status(job_id):
+    """Poll the status and result of a background transcription job"""
+    job = transcription_jobs.get(job_id)
+    if not job:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status': job['status'],
+        'transcription': job['result'] or '',
+        'error': job['error']
+    })
+
+
 @app.route('/toggle_theme')
 def toggle_theme():
     """Toggle between light and dark theme"""
@@ -495,78 +2148,883 @@ def toggle_theme():
 
 @app.route('/set_directory', methods=['POST'])
 def set_directory():
-    """Change the video directory"""
-    global VIDEO_DIRECTORY
-    new_directory = request.form.get('directory')
-    last_directory = request.cookies.get('last_directory')
-
-    if new_directory and os.path.isdir(new_directory):
-        VIDEO_DIRECTORY = new_directory
-        response = redirect(url_for('index'))
-        response.set_cookie('last_directory', new_directory)
-        return response
-    else:
+    """Change the video directory for this browser"""
+    new_directory = request.form.get('directory', '').strip()
+    if not library_roots.is_allowed(new_directory):
+        flash("Dieses Verzeichnis ist nicht freigegeben", "error")
+        return redirect(url_for('index'))
+
+    if not os.path.isdir(new_directory):
         try:
             # Try to create the directory if it doesn't exist
             os.makedirs(new_directory, exist_ok=True)
-            VIDEO_DIRECTORY = new_directory
-            response = redirect(url_for('index'))
-            response.set_cookie('last_directory', new_directory)
-            return response
         except Exception as e:
             logger.error(f"Error creating directory: {e}")
             flash(f"Fehler beim Erstellen des Verzeichnisses: {e}", "error")
             return redirect(url_for('index'))
 
+    root = library_roots.resolve(new_directory)
+    library_roots.register(root)
+    response = redirect(url_for('index'))
+    response.set_cookie('last_directory', root)
+    return response
+
+
+def vtt_time_to_seconds(timestamp):
+    """Convert a VTT timestamp (HH:MM:SS.mmm or MM:SS.mmm) to seconds"""
+    seconds = 0.0
+    for part in timestamp.replace(',', '.').split(':'):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def seconds_to_vtt_time(seconds):
+    """Format seconds as a VTT timestamp (HH:MM:SS.mmm)"""
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    return f"{hours:02d}:{minutes:02d}:{millis // 1000:02d}.{millis % 1000:03d}"
+
+
+@metrics.timed('store_operation_duration_seconds',
+               store='vtt', operation='parse')
+def parse_vtt_cues(subtitle_path):
+    """Parse a VTT file into cues with display times and numeric offsets"""
+    cues = []
+    with open(subtitle_path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+
+        # Look for timestamp lines (00:00:00.000 --> 00:00:00.000)
+        if '-->' in line:
+            start_time, end_time = line.split('-->', 1)
+            start_time = start_time.strip()
+            # Drop cue settings such as "align:start" after the end time
+            end_time = end_time.split()[0] if end_time.split() else ''
+
+            # Get subtitle text (can be multiple lines)
+            text_lines = []
+            i += 1
+            while i < len(lines) and lines[i].strip() != '':
+                text_lines.append(lines[i].strip())
+                i += 1
+
+            text = ' '.join(text_lines)
+            if text:  # Only add if there's actual text
+                cues.append({
+                    'start': start_time,
+                    'end': end_time,
+                    'start_seconds': vtt_time_to_seconds(start_time),
+                    'end_seconds': vtt_time_to_seconds(end_time),
+                    'text': text
+                })
+        i += 1
+
+    return cues
 
-@app.route('/api/get_subtitles/<video_basename>')
+
+class SubtitleCache:
+    """LRU cache of serialized subtitle responses keyed by path and mtime"""
+
+    def __init__(self, max_entries=64):
+        self.entries = OrderedDict()
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+
+    def get(self, subtitle_path):
+        """Return (json body, etag) for a VTT file, parsing only on change"""
+        stat = os.stat(subtitle_path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            cached = self.entries.get(subtitle_path)
+            if cached and cached[0] == version:
+                self.entries.move_to_end(subtitle_path)
+                return cached[1], cached[2]
+
+        cues = parse_vtt_cues(subtitle_path)
+        # Cues are sorted by start so the player can binary-search them
+        cues.sort(key=lambda cue: cue['start_seconds'])
+        body = json.dumps({
+            'success': True,
+            'subtitles': cues,
+            'starts': [cue['start_seconds'] for cue in cues]
+        }, ensure_ascii=False)
+        etag = f"{version[0]:x}-{version[1]:x}"
+
+        with self.lock:
+            self.entries[subtitle_path] = (version, body, etag)
+            self.entries.move_to_end(subtitle_path)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return body, etag
+
+
+subtitle_cache = SubtitleCache()
+
+
+def fold_german(text):
+    """Lowercase, ß as ss and umlauts without their dots"""
+    text = text.lower().replace('ß', 'ss')
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize_german(text):
+    return re.findall(r'[^\W_]+', fold_german(text))
+
+
+def umlaut_spellings(tokens):
+    """Query tokens with ae/oe/ue read as umlauts, or None if there are none.
+
+    Only queries are folded this way: in indexed text most of these letter
+    pairs are not umlauts (Bauer, Feuer, neue).
+    """
+    folded = [re.sub(r'(?<!q)([aou])e', r'\1', token) for token in tokens]
+    return folded if folded != tokens else None
+
+
+class SubtitleSearchIndex:
+    """SQLite FTS5 index over every *-subtitles.vtt below the library roots.
+
+    Cue text is stored folded for matching and verbatim for display; files
+    are re-indexed only when their mtime or size changes.
+    """
+
+    # Bumped whenever the folded text changes, to re-index existing files
+    VERSION = 1
+
+    def __init__(self, db_path, interval=300):
+        self.db_path = db_path
+        self.interval = interval
+        self.roots = set()
+        self.write_lock = threading.Lock()
+        with self._connect() as db:
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    root TEXT NOT NULL,
+                    mtime INTEGER NOT NULL,
+                    size INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS cue_rows (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    start REAL NOT NULL,
+                    start_display TEXT NOT NULL,
+                    text TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS cue_rows_path ON cue_rows(path);
+                CREATE VIRTUAL TABLE IF NOT EXISTS cue_text
+                    USING fts5(folded, tokenize='unicode61');
+            """)
+            if db.execute('PRAGMA user_version').fetchone()[0] < self.VERSION:
+                db.execute('DELETE FROM cue_text')
+                db.execute('DELETE FROM cue_rows')
+                db.execute('DELETE FROM files')
+                db.execute(f'PRAGMA user_version = {self.VERSION}')
+
+    def _connect(self):
+        return connect_db(self.db_path)
+
+    def watch(self, root):
+        """Index a library root now and keep it updated in the background"""
+        root = os.path.abspath(root)
+        with self.write_lock:
+            if root in self.roots:
+                return
+            self.roots.add(root)
+        threading.Thread(target=self._run, args=(root, ), daemon=True).start()
+
+    def _run(self, root):
+        while True:
+            try:
+                self.refresh(root)
+            except Exception as e:
+                logger.error(f"Error refreshing subtitle index: {e}")
+            time.sleep(self.interval)
+
+    def refresh(self, root):
+        """Re-index changed subtitle files below root and drop removed ones"""
+        found = {}
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            stack.append(entry.path)
+                        elif entry.name.endswith('-subtitles.vtt'):
+                            stat = entry.stat()
+                            found[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError as e:
+                logger.error(f"Error scanning {directory} for subtitles: {e}")
+
+        with self._connect() as db:
+            known = {path: (mtime, size) for path, mtime, size in db.execute(
+                'SELECT path, mtime, size FROM files WHERE root = ?', (root, ))}
+        for path in set(known) - set(found):
+            self.remove_file(path)
+        for path, version in found.items():
+            if known.get(path) != version:
+                self.update_file(path, root)
+
+    @metrics.timed('store_operation_duration_seconds',
+                   store='subtitle_index', operation='update_file')
+    def update_file(self, path, root):
+        """(Re-)index a single VTT file, e.g. right after an upload"""
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+            cues = parse_vtt_cues(path)
+        except Exception as e:
+            logger.error(f"Error indexing subtitle file {path}: {e}")
+            return
+
+        with self.write_lock, self._connect() as db:
+            self._delete_cues(db, path)
+            for cue in cues:
+                cursor = db.execute(
+                    'INSERT INTO cue_rows (path, start, start_display, text) '
+                    'VALUES (?, ?, ?, ?)',
+                    (path, cue['start_seconds'], cue['start'], cue['text']))
+                db.execute('INSERT INTO cue_text (rowid, folded) VALUES (?, ?)',
+                           (cursor.lastrowid, ' '.join(tokenize_german(cue['text']))))
+            db.execute(
+                'INSERT OR REPLACE INTO files (path, root, mtime, size) '
+                'VALUES (?, ?, ?, ?)',
+                (path, os.path.abspath(root), stat.st_mtime_ns, stat.st_size))
+
+    def remove_file(self, path):
+        with self.write_lock, self._connect() as db:
+            self._delete_cues(db, path)
+            db.execute('DELETE FROM files WHERE path = ?', (path, ))
+
+    def _delete_cues(self, db, path):
+        db.execute('DELETE FROM cue_text WHERE rowid IN '
+                   '(SELECT id FROM cue_rows WHERE path = ?)', (path, ))
+        db.execute('DELETE FROM cue_rows WHERE path = ?', (path, ))
+
+    @metrics.timed('store_operation_duration_seconds',
+                   store='subtitle_index', operation='search')
+    def search(self, root, query, limit=50, offset=0):
+        """Phrase search (last word as prefix); returns (hits, total)"""
+        tokens = tokenize_german(query)
+        if not tokens:
+            return [], 0
+        phrases = [tokens]
+        folded = umlaut_spellings(tokens)
+        if folded:
+            phrases.append(folded)
+        match = ' OR '.join('"' + ' '.join(phrase) + '"*' for phrase in phrases)
+        root = os.path.abspath(root)
+
+        with self._connect() as db:
+            total = db.execute(
+                'SELECT COUNT(*) FROM cue_text JOIN cue_rows ON cue_rows.id = cue_text.rowid '
+                'JOIN files ON files.path = cue_rows.path '
+                'WHERE cue_text MATCH ? AND files.root = ?',
+                (match, root)).fetchone()[0]
+            rows = db.execute(
+                'SELECT cue_rows.path, cue_rows.start, cue_rows.start_display, cue_rows.text '
+                'FROM cue_text JOIN cue_rows ON cue_rows.id = cue_text.rowid '
+                'JOIN files ON files.path = cue_rows.path '
+                'WHERE cue_text MATCH ? AND files.root = ? '
+                'ORDER BY cue_text.rank LIMIT ? OFFSET ?',
+                (match, root, limit, offset)).fetchall()
+
+        hits = []
+        for path, start, start_display, text in rows:
+            rel_dir = os.path.relpath(os.path.dirname(path), root)
+            basename = os.path.basename(path)[:-len('-subtitles.vtt')]
+            hits.append({
+                'basename': basename,
+                'video_path': find_video_for_basename(root, rel_dir, basename),
+                'start': start,
+                'start_display': start_display.split('.')[0],
+                'snippet': text
+            })
+        return hits, total
+
+
+def find_video_for_basename(root, rel_dir, basename):
+    """Relative path of the video a sidecar file belongs to, if it exists"""
+    try:
+        _, files = directory_index.scan(os.path.join(root, rel_dir))
+    except OSError:
+        return None
+    for item in files:
+        name, ext = os.path.splitext(item)
+        if name == basename and ext.lower() in VIDEO_EXTENSIONS:
+            return os.path.join(rel_dir, item).replace('\\', '/')
+    return None
+
+
+subtitle_index = SubtitleSearchIndex(
+    SUBTITLE_INDEX_DB,
+    interval=int(os.environ.get("SUBTITLE_INDEX_INTERVAL", "300")))
+
+# Configured roots are indexed up front instead of on their first visit
+for configured_root in sorted(library_roots.allowed):
+    library_roots.register(configured_root)
+
+
+@app.route('/api/search_subtitles')
+def search_subtitles():
+    """API to full-text search the subtitles of every video in the library"""
+    query = request.args.get('q', '')
+    limit = min(request.args.get('limit', 50, type=int), 200)
+    offset = request.args.get('offset', 0, type=int)
+    root = library_root()
+    library_roots.register(root)
+    try:
+        hits, total = subtitle_index.search(root, query,
+                                            limit=limit, offset=offset)
+        return jsonify({'success': True, 'hits': hits, 'total': total})
+    except Exception as e:
+        logger.error(f"Subtitle search error: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/get_subtitles/<path:video_basename>')
 def get_subtitles(video_basename):
     """Get subtitle data from VTT file"""
-    subtitle_path = os.path.join(VIDEO_DIRECTORY,
-                                 f"{video_basename}-subtitles.vtt")
+    # The basename is relative to the library root and may include folders
+    subtitle_path = safe_join(library_root(), f"{video_basename}-subtitles.vtt")
 
-    if not os.path.exists(subtitle_path):
+    if not subtitle_path or not os.path.exists(subtitle_path):
         return jsonify({'success': False, 'error': 'Subtitle file not found'})
 
     try:
-        subtitles = []
-        with open(subtitle_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-
-            i = 0
-            while i < len(lines):
-                line = lines[i].strip()
-
-                # Look for timestamp lines (00:00:00.000 --> 00:00:00.000)
-                if '-->' in line:
-                    # Get timestamp
-                    timestamp = line
-                    start_time = timestamp.split('-->')[0].strip()
-                    end_time = timestamp.split('-->')[1].strip()
-
-                    # Get subtitle text (can be multiple lines)
-                    text_lines = []
-                    i += 1
-                    while i < len(lines) and lines[i].strip() != '':
-                        text_lines.append(lines[i].strip())
-                        i += 1
-
-                    text = ' '.join(text_lines)
-                    if text:  # Only add if there's actual text
-                        subtitles.append({
-                            'start': start_time,
-                            'end': end_time,
-                            'text': text
-                        })
-                i += 1
-
-        return jsonify({'success': True, 'subtitles': subtitles})
+        body, etag = subtitle_cache.get(subtitle_path)
+        response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
 
     except Exception as e:
         logger.error(f"Error reading subtitle file: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
 
+FFMPEG_PATH = os.environ.get("FFMPEG_PATH", "ffmpeg")
+FFPROBE_PATH = os.environ.get("FFPROBE_PATH", "ffprobe")
+
+
+def probe_duration(video_path):
+    """Video duration in seconds, read from the container by ffprobe"""
+    result = subprocess.run(
+        [FFPROBE_PATH, '-v', 'error', '-show_entries', 'format=duration',
+         '-of', 'default=noprint_wrappers=1:nokey=1', video_path],
+        capture_output=True, text=True, check=True)
+    return float(result.stdout.strip())
+
+
+def is_up_to_date(output_path, source_path):
+    """True if output_path exists and is not older than source_path"""
+    try:
+        return os.stat(output_path).st_mtime >= os.stat(source_path).st_mtime
+    except OSError:
+        return False
+
+
+def find_library_videos(root):
+    """Yield the path of every video file below root"""
+    for dirpath, _, file_names in os.walk(root):
+        for name in file_names:
+            if os.path.splitext(name)[1].lower() in VIDEO_EXTENSIONS:
+                yield os.path.join(dirpath, name)
+
+
+class ThumbnailGenerator:
+    """Spritesheets, -thumbnails.vtt files and covers generated with ffmpeg"""
+
+    def __init__(self, workers=2, interval=5, size=(360, 201), columns=10,
+                 exact=False):
+        self.workers = workers
+        self.interval = interval
+        self.size = size
+        self.columns = columns
+        self.exact = exact
+
+    def generate(self, root, covers=True, force=False):
+        """Process every video below root; returns counts per outcome"""
+        counts = {'generated': 0, 'skipped': 0, 'failed': 0}
+        # Each task is an ffmpeg subprocess, so threads are enough to keep
+        # several decoders busy in parallel
+        with ThreadPoolExecutor(max_workers=self.workers,
+                                thread_name_prefix="thumbnails") as pool:
+            for outcome in pool.map(
+                    lambda path: self.process(path, covers, force),
+                    find_library_videos(root)):
+                counts[outcome] += 1
+        logger.info(f"Thumbnail generation in {root}: {counts}")
+        return counts
+
+    def process(self, video_path, covers=True, force=False):
+        base = os.path.splitext(video_path)[0]
+        sprite_path = f"{base}-spritesheet.jpg"
+        vtt_path = f"{base}-thumbnails.vtt"
+        cover_path = f"{base}.jpg"
+        # Hand-made covers are kept, so a cover is only made when missing
+        need_sprites = force or not (is_up_to_date(sprite_path, video_path)
+                                     and is_up_to_date(vtt_path, video_path))
+        need_cover = covers and (force or not os.path.exists(cover_path))
+        if not need_sprites and not need_cover:
+            return 'skipped'
+
+        try:
+            duration = probe_duration(video_path)
+            if need_sprites:
+                self.write_spritesheet(video_path, duration, sprite_path,
+                                       vtt_path)
+            if need_cover:
+                self.write_cover(video_path, duration, cover_path)
+            return 'generated'
+        except (OSError, ValueError, subprocess.CalledProcessError) as e:
+            logger.error(f"Error generating thumbnails for {video_path}: {e}")
+            return 'failed'
+
+    @metrics.timed('external_call_duration_seconds', service='ffmpeg')
+    def write_spritesheet(self, video_path, duration, sprite_path, vtt_path):
+        """Tile one frame per interval into a grid and describe it in VTT"""
+        width, height = self.size
+        count = max(1, math.ceil(duration / self.interval))
+        columns = min(self.columns, count)
+        rows = math.ceil(count / columns)
+
+        # Decoding only keyframes is far cheaper than a full decode, but the
+        # fps filter then repeats the latest keyframe for each tile, so a
+        # tile can show a frame up to one GOP (often 2-10 s) before its cue.
+        # exact decodes every frame and takes the frame at the tile's time
+        skip_frames = [] if self.exact else ['-skip_frame', 'nokey']
+        tmp_path = f"{os.path.splitext(sprite_path)[0]}.tmp.jpg"
+        subprocess.run(
+            [FFMPEG_PATH, '-v', 'error', '-y', *skip_frames,
+             '-i', video_path, '-an',
+             '-vf', f"fps=1/{self.interval},"
+                    f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                    f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,"
+                    f"tile={columns}x{rows}",
+             '-frames:v', '1', '-q:v', '5', tmp_path],
+            capture_output=True, check=True)
+        os.replace(tmp_path, sprite_path)
+
+        # Versioned like asset_url, so the sheet is cached as immutable
+        sprite_url = (f"{quote(os.path.basename(sprite_path))}"
+                      f"?v={os.stat(sprite_path).st_mtime_ns:x}")
+        lines = ['WEBVTT', '']
+        for i in range(count):
+            start = i * self.interval
+            end = min(start + self.interval, duration)
+            x = (i % columns) * width
+            y = (i // columns) * height
+            lines.append(f"{seconds_to_vtt_time(start)} --> "
+                         f"{seconds_to_vtt_time(end)}")
+            lines.append(f"{sprite_url}#xywh={x},{y},{width},{height}")
+            lines.append('')
+        tmp_path = f"{vtt_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines))
+        os.replace(tmp_path, vtt_path)
+
+    @metrics.timed('external_call_duration_seconds', service='ffmpeg')
+    def write_cover(self, video_path, duration, cover_path):
+        """Grab a frame a tenth of the way in, past most intros"""
+        tmp_path = f"{os.path.splitext(cover_path)[0]}.tmp.jpg"
+        subprocess.run(
+            [FFMPEG_PATH, '-v', 'error', '-y', '-ss', f"{duration * 0.1:.3f}",
+             '-i', video_path, '-an', '-frames:v', '1',
+             '-vf', f"scale={self.size[0] * 2}:-2", '-q:v', '3', tmp_path],
+            capture_output=True, check=True)
+        os.replace(tmp_path, cover_path)
+
+
+thumbnail_generator = ThumbnailGenerator(
+    workers=int(os.environ.get("THUMBNAIL_WORKERS",
+                               max(1, (os.cpu_count() or 2) // 2))),
+    exact=os.environ.get("THUMBNAIL_EXACT", "0") == "1")
+thumbnail_jobs = BackgroundJobs("thumbnails", max_workers=1, max_pending=1)
+
+
+@app.route('/api/thumbnails/generate', methods=['POST'])
+def generate_thumbnails():
+    """Start generating missing or outdated thumbnails for the library"""
+    data = request.get_json(silent=True) or {}
+    try:
+        job_id = thumbnail_jobs.submit(thumbnail_generator.generate,
+                                       library_root(),
+                                       bool(data.get('covers', True)),
+                                       bool(data.get('force', False)))
+        return jsonify({'success': True, 'job_id': job_id})
+    except RuntimeError as e:
+        return jsonify({'success': False, 'error': str(e)}), 503
+
+
+@app.route('/api/thumbnails/jobs/<job_id>')
+def thumbnail_job_status(job_id):
+    """Poll a thumbnail generation job"""
+    job = thumbnail_jobs.get(job_id)
+    if not job:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status': job['status'],
+        'counts': job['result'],
+        'error': job['error']
+    })
+
+
+class SubtitleGenerator:
+    """Offline Whisper subtitles for library videos without -subtitles.vtt"""
+
+    def __init__(self, model, workers=2, chunk_seconds=30, language="de"):
+        self.model = model
+        # The model serializes inference, so extra workers mainly overlap
+        # one video's ffmpeg decoding with another's transcription
+        self.workers = workers
+        self.chunk_seconds = chunk_seconds
+        self.language = language
+        self.progress = {}
+        self.lock = threading.Lock()
+
+    def generate(self, root):
+        """Subtitle every video below root that has none; returns the progress"""
+        videos = [path for path in find_library_videos(root)
+                  if not os.path.exists(self.subtitle_path(path))]
+        with self.lock:
+            self.progress = {
+                'videos_total': len(videos),
+                'videos_done': 0,
+                'videos_failed': 0,
+                'audio_seconds': 0.0,
+                'elapsed_seconds': 0.0,
+                'realtime_factor': None,
+                'started': time.time()
+            }
+        with ThreadPoolExecutor(max_workers=self.workers,
+                                thread_name_prefix="subtitles") as pool:
+            for ok in pool.map(lambda path: self._process_logged(path, root),
+                               videos):
+                self._update(videos_done=1 if ok else 0,
+                             videos_failed=0 if ok else 1)
+        snapshot = self.snapshot()
+        logger.info(f"Subtitle generation in {root}: {snapshot}")
+        return snapshot
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.progress)
+
+    def _update(self, **increments):
+        with self.lock:
+            for key, value in increments.items():
+                self.progress[key] += value
+            elapsed = time.time() - self.progress['started']
+            self.progress['elapsed_seconds'] = round(elapsed, 1)
+            # Seconds of audio transcribed per wall-clock second
+            if elapsed > 0:
+                self.progress['realtime_factor'] = round(
+                    self.progress['audio_seconds'] / elapsed, 2)
+
+    @staticmethod
+    def subtitle_path(video_path):
+        return f"{os.path.splitext(video_path)[0]}-subtitles.vtt"
+
+    def _process_logged(self, video_path, root):
+        try:
+            self.process(video_path)
+            subtitle_index.update_file(self.subtitle_path(video_path), root)
+            return True
+        except Exception as e:
+            logger.error(f"Error generating subtitles for {video_path}: {e}")
+            return False
+
+    def process(self, video_path):
+        """Transcribe one video chunk by chunk, resuming a saved partial run"""
+        vtt_path = self.subtitle_path(video_path)
+        partial_path = f"{vtt_path}.partial"
+        source_mtime = os.stat(video_path).st_mtime
+        offset, cues = self._load_partial(partial_path, source_mtime)
+        if offset:
+            logger.info(f"Resuming {video_path} at {offset:.1f}s")
+
+        # ffmpeg streams 16 kHz mono PCM, so only one chunk is in memory
+        decoder = subprocess.Popen(
+            [FFMPEG_PATH, '-v', 'error', '-ss', f"{offset:.3f}",
+             '-i', video_path, '-vn', '-ac', '1', '-ar', str(WHISPER_RATE),
+             '-f', 's16le', '-'],
+            stdout=subprocess.PIPE)
+        chunk_samples = int(self.chunk_seconds * WHISPER_RATE)
+        pending = np.zeros(0, dtype=np.int16)
+        try:
+            finished = False
+            while not finished:
+                wanted = (chunk_samples - len(pending)) * 2
+                data = decoder.stdout.read(wanted)
+                finished = len(data) < wanted
+                data = data[:len(data) - len(data) % 2]
+                samples = np.concatenate(
+                    [pending, np.frombuffer(data, dtype=np.int16)])
+                if not len(samples):
+                    break
+
+                consumed, new_cues = self._transcribe_window(
+                    samples, offset, cues, finished)
+                cues.extend(new_cues)
+                pending = samples[consumed:]
+                offset += consumed / WHISPER_RATE
+                self._save_partial(partial_path, source_mtime, offset, cues)
+                self._update(audio_seconds=consumed / WHISPER_RATE)
+
+            if decoder.wait() != 0:
+                raise subprocess.CalledProcessError(decoder.returncode,
+                                                    FFMPEG_PATH)
+        finally:
+            if decoder.poll() is None:
+                decoder.kill()
+                decoder.wait()
+
+        self._write_vtt(vtt_path, cues)
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+
+    def _transcribe_window(self, samples, offset, cues, finished):
+        """Transcribe a window; returns (samples consumed, new cues)"""
+        audio = samples.astype(np.float32) / 32768.0
+        prompt = ' '.join(cue[2] for cue in cues[-3:])[-200:] or None
+        segments = [segment for segment in self.model.transcribe_segments(
+            audio, self.language, prompt) if segment[2]]
+
+        # The last segment may be cut off at the window edge, so it is
+        # transcribed again at the start of the next window
+        consumed = len(samples)
+        if not finished and len(segments) > 1:
+            cut = int(segments[-1][0] * WHISPER_RATE)
+            if WHISPER_RATE <= cut < len(samples):
+                segments = segments[:-1]
+                consumed = cut
+
+        window_end = offset + consumed / WHISPER_RATE
+        return consumed, [(offset + start, min(offset + end, window_end), text)
+                          for start, end, text in segments]
+
+    @staticmethod
+    def _load_partial(partial_path, source_mtime):
+        try:
+            with open(partial_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return 0.0, []
+        if state.get('source_mtime') != source_mtime:
+            return 0.0, []
+        return state['offset'], [tuple(cue) for cue in state['cues']]
+
+    @staticmethod
+    def _save_partial(partial_path, source_mtime, offset, cues):
+        tmp_path = f"{partial_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'source_mtime': source_mtime, 'offset': offset,
+                       'cues': cues}, f, ensure_ascii=False)
+        os.replace(tmp_path, partial_path)
+
+    @staticmethod
+    def _write_vtt(vtt_path, cues):
+        lines = ['WEBVTT', '']
+        for number, (start, end, text) in enumerate(cues, 1):
+            lines.extend([str(number),
+                          f"{seconds_to_vtt_time(start)} --> "
+                          f"{seconds_to_vtt_time(end)}",
+                          text, ''])
+        tmp_path = f"{vtt_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines))
+        os.replace(tmp_path, vtt_path)
+
+
+subtitle_generator = SubtitleGenerator(
+    speech_model,
+    workers=int(os.environ.get("SUBTITLE_WORKERS", "2")),
+    chunk_seconds=int(os.environ.get("SUBTITLE_CHUNK_SECONDS", "30")))
+subtitle_jobs = BackgroundJobs("subtitles", max_workers=1, max_pending=1)
+
+
+@app.route('/api/subtitles/generate', methods=['POST'])
+def generate_subtitles():
+    """Start transcribing every library video that has no subtitles"""
+    try:
+        job_id = subtitle_jobs.submit(subtitle_generator.generate,
+                                      library_root())
+        return jsonify({'success': True, 'job_id': job_id})
+    except RuntimeError as e:
+        return jsonify({'success': False, 'error': str(e)}), 503
+
+
+@app.route('/api/subtitles/jobs/<job_id>')
+def subtitle_job_status(job_id):
+    """Poll a subtitle generation job, with live progress while running"""
+    job = subtitle_jobs.get(job_id)
+    if not job:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status': job['status'],
+        'progress': job['result'] or subtitle_generator.snapshot(),
+        'error': job['error']
+    })
+
+
+class GoogleTranslateBackend:
+    """googletrans client, reused per worker thread"""
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def translate(self, texts, target_language):
+        from googletrans import Translator
+
+        if not hasattr(self.local, 'translator'):
+            self.local.translator = Translator()
+        results = self.local.translator.translate(texts, dest=target_language)
+        return [(result.text, result.src) for result in results]
+
+
+class StubTranslateBackend:
+    """Offline stand-in that echoes the text back, for tests and offline use"""
+
+    def translate(self, texts, target_language):
+        return [(text, 'de') for text in texts]
+
+
+TRANSLATION_BACKENDS = {
+    'google': GoogleTranslateBackend,
+    'stub': StubTranslateBackend
+}
+
+
+class TranslationService:
+    """Batching translation layer with a persistent SQLite cache.
+
+    Lookups hit the cache first; only unseen texts go to the backend, in
+    batches, with at most max_concurrency backend calls in flight.
+    """
+
+    def __init__(self, backend, db_path, batch_size=50, max_concurrency=4):
+        self.backend = backend
+        self.db_path = db_path
+        self.batch_size = batch_size
+        # The shared pool caps backend calls in flight across all requests
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency,
+                                           thread_name_prefix="translate")
+        with connect_db(self.db_path) as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS translations (
+                    text TEXT NOT NULL,
+                    target TEXT NOT NULL,
+                    translated TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    PRIMARY KEY (text, target)
+                )
+            """)
+
+    def translate_many(self, texts, target_language):
+        """Return [(translated_text, source_language, error)] in input order.
+
+        A failing batch is retried text by text, so one bad text only fails
+        itself; its translation and source are None and error says why.
+        """
+        unique = list(dict.fromkeys(texts))
+        results = {}
+        with connect_db(self.db_path) as db:
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                for text, translated, source in db.execute(
+                        f'SELECT text, translated, source FROM translations '
+                        f'WHERE target = ? AND text IN ({placeholders})',
+                        [target_language, *chunk]):
+                    results[text] = (translated, source, None)
+
+        missing = [text for text in unique if text not in results]
+        if missing:
+            batches = [missing[i:i + self.batch_size]
+                       for i in range(0, len(missing), self.batch_size)]
+            futures = [self.executor.submit(self._translate_batch, batch,
+                                            target_language)
+                       for batch in batches]
+            fresh = []
+            for batch, future in zip(batches, futures):
+                try:
+                    fresh.extend(zip(batch, future.result()))
+                except Exception as e:
+                    logger.error(f"Translation batch failed, retrying one by one: {e}")
+                    fresh.extend(self._translate_each(batch, target_language,
+                                                      results))
+            for text, (translated, source) in fresh:
+                results[text] = (translated, source, None)
+            with connect_db(self.db_path) as db:
+                db.executemany(
+                    'INSERT OR REPLACE INTO translations '
+                    '(text, target, translated, source) VALUES (?, ?, ?, ?)',
+                    [(text, target_language, translated, source)
+                     for text, (translated, source) in fresh])
+
+        return [results[text] for text in texts]
+
+    def _translate_each(self, batch, target_language, results):
+        """Translate texts singly; failures go into results with their error"""
+        futures = [self.executor.submit(self._translate_batch, [text],
+                                        target_language) for text in batch]
+        translated = []
+        for text, future in zip(batch, futures):
+            try:
+                translated.append((text, future.result()[0]))
+            except Exception as e:
+                logger.error(f"Translation error for {text[:40]!r}: {e}")
+                results[text] = (None, None, str(e))
+        return translated
+
+    @metrics.timed('external_call_duration_seconds', service='translate')
+    def _translate_batch(self, batch, target_language):
+        return self.backend.translate(batch, target_language)
+
+
+translation_service = TranslationService(
+    TRANSLATION_BACKENDS[os.environ.get("TRANSLATION_BACKEND", "google")](),
+    TRANSLATION_CACHE_DB,
+    max_concurrency=int(os.environ.get("TRANSLATION_CONCURRENCY", "4")))
+
+
+def translate_result(text, target_language):
+    """Response body for a single translation"""
+    if not text:
+        return {'success': False, 'error': 'No text provided'}
+
+    try:
+        translated_text, source_language, error = translation_service.translate_many(
+            [text], target_language)[0]
+        if error:
+            return {'success': False, 'error': error}
+
+        return {
+            'success': True,
+            'translated_text': translated_text,
+            'source_language': source_language,
+            'target_language': target_language
+        }
+
+    except Exception as e:
+        logger.error(f"Translation error: {e}")
+        return {'success': False, 'error': str(e)}
+
+
 @app.route('/api/translate', methods=['POST'])
 def translate_text():
     """Translate text using Google Translate"""
@@ -574,25 +3032,37 @@ def translate_text():
         data = request.get_json()
         text = data.get('text', '')
         target_language = data.get('target_language', 'de')
-        remember_lang = data.get('remember_lang', False)
-
-        if not text:
-            return jsonify({'success': False, 'error': 'No text provided'})
 
         # Save target language preference if requested
-        if remember_lang:
+        if text and data.get('remember_lang', False):
             session['target_language'] = target_language
             logger.debug(
                 f"Saved target language preference: {target_language}")
 
-        translator = Translator()
-        result = translator.translate(text, dest=target_language)
+        return jsonify(translate_result(text, target_language))
+
+    except Exception as e:
+        logger.error(f"Translation error: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
 
+@app.route('/api/translate_batch', methods=['POST'])
+def translate_batch():
+    """Translate many texts (e.g. all subtitle cues) in one request"""
+    try:
+        data = request.get_json()
+        texts = data.get('texts', [])
+        target_language = data.get('target_language', 'de')
+
+        if not texts:
+            return jsonify({'success': False, 'error': 'No text provided'})
+
+        results = translation_service.translate_many(texts, target_language)
         return jsonify({
             'success': True,
-            'translated_text': result.text,
-            'source_language': result.src,
-            'target_language': result.dest
+            'translated_texts': [translated for translated, _, _ in results],
+            'errors': [error for _, _, error in results],
+            'target_language': target_language
         })
 
     except Exception as e:
@@ -600,75 +3070,233 @@ def translate_text():
         return jsonify({'success': False, 'error': str(e)})
 
 
-@app.route('/api/explain_word', methods=['GET'])
-def explain_word():
-    """Get word explanation from Duden"""
-    word = request.args.get('word', '')
+try:
+    import simplemma
+except ImportError:
+    simplemma = None
+    logger.warning("simplemma is not installed, Duden lookups are cached "
+                   "per word form instead of per lemma")
+
+
+def normalize_word(word):
+    """Strip punctuation and reduce a word to its lemma where possible"""
+    word = unicodedata.normalize('NFC', word).strip(' .,;:!?()[]"\'„“‚‘»«…–—')
+    if simplemma is None:
+        return word
+    return simplemma.lemmatize(word, lang='de')
+
+
+def duden_lookup(word):
+    """Scrape a word from duden.de; returns None if Duden doesn't know it"""
+    from duden import get
+
+    word_obj = get(word)
+    if not word_obj:
+        return None
+
+    explanation = {
+        'meaning':
+        word_obj.meaning
+        if hasattr(word_obj, 'meaning') else 'Keine Bedeutung gefunden',
+    }
+
+    # Add grammar if available (using inflection instead of grammar_raw)
+    if hasattr(word_obj, 'inflection'):
+        explanation['grammar'] = word_obj.inflection
+
+    # Add article if available
+    if hasattr(word_obj, 'article'):
+        explanation['article'] = word_obj.article
+
+    # Add synonyms if available
+    if hasattr(word_obj, 'synonyms') and word_obj.synonyms:
+        explanation['synonyms'] = word_obj.synonyms
+
+    return explanation
+
+
+class DictionaryCache:
+    """SQLite cache of dictionary lookups keyed on the normalized lemma.
+
+    The key keeps its case, since Duden has separate entries for homographs
+    such as Essen/essen or Arm/arm. Misses are cached too (with a shorter
+    TTL); once the table grows past max_entries the oldest lookups are
+    evicted. The size is checked every trim_interval stores rather than on
+    each one.
+    """
+
+    # Bumped whenever the key format changes, to drop the old entries
+    VERSION = 1
+
+    def __init__(self, db_path, lookup, ttl=30 * 86400,
+                 negative_ttl=86400, max_entries=50000, prefetch_delay=0.2,
+                 trim_interval=100, max_prefetched=1024):
+        self.db_path = db_path
+        self.lookup = lookup
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.prefetch_delay = prefetch_delay
+        self.trim_interval = trim_interval
+        self.stores = 0
+        # Subtitle path -> mtime of the version already prefetched (LRU)
+        self.prefetched = OrderedDict()
+        self.max_prefetched = max_prefetched
+        self.lock = threading.Lock()
+        with connect_db(self.db_path) as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS words (
+                    key TEXT PRIMARY KEY,
+                    explanation TEXT,
+                    fetched REAL NOT NULL
+                )
+            """)
+            db.execute('CREATE INDEX IF NOT EXISTS words_fetched ON words(fetched)')
+            if db.execute('PRAGMA user_version').fetchone()[0] < self.VERSION:
+                db.execute('DELETE FROM words')
+                db.execute(f'PRAGMA user_version = {self.VERSION}')
+
+    def _cached(self, db, key):
+        """(hit, explanation) for a key, ignoring expired entries"""
+        row = db.execute('SELECT explanation, fetched FROM words WHERE key = ?',
+                         (key, )).fetchone()
+        if not row:
+            return False, None
+        explanation, fetched = row
+        ttl = self.ttl if explanation is not None else self.negative_ttl
+        if time.time() - fetched > ttl:
+            return False, None
+        return True, json.loads(explanation) if explanation else None
+
+    def explain(self, word):
+        """Explanation dict for a word, or None if it isn't in the dictionary"""
+        key = lemma = normalize_word(word)
+        if not key:
+            return None
+        with connect_db(self.db_path) as db:
+            hit, explanation = self._cached(db, key)
+        if hit:
+            return explanation
+
+        with metrics.timer('external_call_duration_seconds', service='duden'):
+            explanation = self.lookup(lemma)
+            if explanation is None and lemma != word:
+                explanation = self.lookup(word)
+        self._store(key, explanation)
+        return explanation
+
+    def _store(self, key, explanation):
+        with connect_db(self.db_path) as db:
+            db.execute(
+                'INSERT OR REPLACE INTO words (key, explanation, fetched) '
+                'VALUES (?, ?, ?)',
+                (key, json.dumps(explanation, ensure_ascii=False, default=str)
+                 if explanation is not None else None, time.time()))
+            with self.lock:
+                self.stores += 1
+                trim = self.stores % self.trim_interval == 0
+            if not trim:
+                return
+            count = db.execute('SELECT COUNT(*) FROM words').fetchone()[0]
+            excess = count - self.max_entries
+            if excess > 0:
+                db.execute('DELETE FROM words WHERE key IN (SELECT key FROM '
+                           'words ORDER BY fetched LIMIT ?)', (excess, ))
+
+    def prefetch(self, words):
+        """Look up every word that isn't cached yet; returns the fetch count"""
+        fetched = 0
+        for word in words:
+            key = normalize_word(word)
+            with connect_db(self.db_path) as db:
+                hit, _ = self._cached(db, key)
+            if hit:
+                continue
+            try:
+                self.explain(word)
+                fetched += 1
+            except Exception as e:
+                logger.error(f"Error prefetching '{word}': {e}")
+            # Be polite to duden.de
+            time.sleep(self.prefetch_delay)
+        return fetched
+
+    def prefetch_subtitles(self, subtitle_path):
+        """Warm the cache for every word in a subtitle file"""
+        words = set()
+        for cue in parse_vtt_cues(subtitle_path):
+            words.update(re.findall(r'[^\W\d_]{3,}', cue['text']))
+        return self.prefetch(sorted(words))
+
+    def schedule_prefetch(self, subtitle_path):
+        """Queue a background prefetch once per version of a subtitle file"""
+        try:
+            mtime = os.stat(subtitle_path).st_mtime_ns
+        except OSError:
+            return
+        with self.lock:
+            if self.prefetched.get(subtitle_path) == mtime:
+                self.prefetched.move_to_end(subtitle_path)
+                return
+            # Claimed before submitting, so concurrent requests queue it once
+            self.prefetched[subtitle_path] = mtime
+            self.prefetched.move_to_end(subtitle_path)
+            while len(self.prefetched) > self.max_prefetched:
+                self.prefetched.popitem(last=False)
+        try:
+            dictionary_jobs.submit(self.prefetch_subtitles, subtitle_path)
+        except RuntimeError as e:
+            logger.debug(f"Skipping dictionary prefetch: {e}")
+            with self.lock:
+                if self.prefetched.get(subtitle_path) == mtime:
+                    del self.prefetched[subtitle_path]
 
-    if not word:
-        return jsonify({'success': False, 'error': 'No word provided'})
 
-    try:
-        # Get word from Duden
-        word_obj = get(word)
-
-        if not word_obj:
-            return jsonify({'success': False, 'error': 'Word not found'})
-
-        # Get explanation
-        explanation = {
-            'word':
-            word,
-            'meaning':
-            word_obj.meaning
-            if hasattr(word_obj, 'meaning') else 'Keine Bedeutung gefunden',
-        }
+dictionary_jobs = BackgroundJobs("prefetch", max_workers=1)
+dictionary_cache = DictionaryCache(
+    DICTIONARY_CACHE_DB,
+    duden_lookup,
+    ttl=int(os.environ.get("DUDEN_CACHE_TTL", str(30 * 86400))),
+    max_entries=int(os.environ.get("DUDEN_CACHE_MAX_ENTRIES", "50000")))
 
-        # Add grammar if available (using inflection instead of grammar_raw)
-        if hasattr(word_obj, 'inflection'):
-            explanation['grammar'] = word_obj.inflection
 
-        # Add article if available
-        if hasattr(word_obj, 'article'):
-            explanation['article'] = word_obj.article
+def explain_word_result(word):
+    """Response body for a Duden word explanation"""
+    if not word:
+        return {'success': False, 'error': 'No word provided'}
 
-        # Add synonyms if available
-        if hasattr(word_obj, 'synonyms') and word_obj.synonyms:
-            explanation['synonyms'] = word_obj.synonyms
+    try:
+        explanation = dictionary_cache.explain(word)
 
-        return jsonify({'success': True, 'explanation': explanation})
+        if not explanation:
+            return {'success': False, 'error': 'Word not found'}
+
+        return {
+            'success': True,
+            'explanation': {'word': word, **explanation}
+        }
 
     except Exception as e:
         if "Connection" in str(e):
             logger.error(f"Duden connection error: {e}")
-            return jsonify({
-                'success':
-                False,
-                'error':
-                'Konnte keine Verbindung zu Duden herstellen'
-            })
+            return {
+                'success': False,
+                'error': 'Konnte keine Verbindung zu Duden herstellen'
+            }
         else:
             logger.error(f"Duden error: {e}")
-            return jsonify({'success': False, 'error': str(e)})
+            return {'success': False, 'error': str(e)}
 
 
-@app.route('/api/auto-correct', methods=['POST'])
-def auto_correct():
-    """Auto-correct the given text using ChatGPT browser automation"""
-    try:
-        from chatgpt_automation.chatgpt_automation import ChatGPTAutomation
-        
-        data = request.get_json()
-        transcription = data.get('transcription', '')
+@app.route('/api/explain_word', methods=['GET'])
+def explain_word():
+    """Get word explanation from Duden"""
+    return jsonify(explain_word_result(request.args.get('word', '')))
 
-        # Initialize ChatGPT automation
-        chat_bot = ChatGPTAutomation(
-            chrome_path=r"C:\Applications\Portable\chrome-win64\chrome.exe",
-            chrome_driver_path=r"C:\UserData\Files\Favorites\Useful Tools\chromedriver-win64\chromedriver.exe"
-        )
 
-        # Create prompt
-        prompt = f"""Du bist ein Assistent für Deutschlerner. Deine Aufgabe ist es, den folgenden Text stilistisch und grammatikalisch zu verbessern. Die Verbesserung soll natürlich und flüssig klingen, aber auf dem Sprachniveau B2 (höchstens C1) bleiben. Wenn es passt, verwende gängige Redewendungen oder idiomatische Ausdrücke.
+def build_correction_prompt(transcription):
+    """Prompt asking for an improved text and a hint separated by ------"""
+    return f"""Du bist ein Assistent für Deutschlerner. Deine Aufgabe ist es, den folgenden Text stilistisch und grammatikalisch zu verbessern. Die Verbesserung soll natürlich und flüssig klingen, aber auf dem Sprachniveau B2 (höchstens C1) bleiben. Wenn es passt, verwende gängige Redewendungen oder idiomatische Ausdrücke.
 
 Text zur Verbesserung:
 {transcription}
@@ -682,19 +3310,217 @@ Formatiere die Ausgabe wie folgt:
 
 Außer diesen beiden Teilen gib nichts weiter aus."""
 
-        # Send prompt and get response
-        chat_bot.send_prompt_to_chatgpt(prompt)
-        response = chat_bot.return_last_response()
-        
-        # Split response into improved text and hint
-        parts = response.split('------')
-        improved_text = parts[0].strip()
-        hint = parts[1].strip() if len(parts) > 1 else "(kein zusätzlicher Hinweis)"
-        
-        return jsonify({
+
+def split_correction_response(response):
+    """Split a model response into (improved text, hint)"""
+    parts = response.split('------')
+    improved_text = parts[0].strip()
+    hint = parts[1].strip() if len(parts) > 1 else "(kein zusätzlicher Hinweis)"
+    return improved_text, hint
+
+
+class ChatGPTBrowserBackend:
+    """The original Selenium ChatGPT automation, kept open between requests"""
+
+    def __init__(self):
+        from chatgpt_automation.chatgpt_automation import ChatGPTAutomation
+
+        self.chat_bot = ChatGPTAutomation(
+            chrome_path=os.environ.get(
+                "CHROME_PATH",
+                r"C:\Applications\Portable\chrome-win64\chrome.exe"),
+            chrome_driver_path=os.environ.get(
+                "CHROMEDRIVER_PATH",
+                r"C:\UserData\Files\Favorites\Useful Tools\chromedriver-win64\chromedriver.exe"))
+
+    def correct(self, text):
+        self.chat_bot.send_prompt_to_chatgpt(build_correction_prompt(text))
+        return split_correction_response(self.chat_bot.return_last_response())
+
+    def close(self):
+        """Quit the browser, e.g. after it crashed"""
+        driver = getattr(self.chat_bot, 'driver', None)
+        if driver is not None:
+            driver.quit()
+
+
+class OpenAIBackend:
+    """Chat completion API client using the same prompt"""
+
+    def __init__(self):
+        import openai
+
+        self.openai = openai
+        self.model = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
+        self.timeout = float(os.environ.get("OPENAI_TIMEOUT", "30"))
+
+    def correct(self, text):
+        response = self.openai.ChatCompletion.create(
+            model=self.model,
+            messages=[{'role': 'user', 'content': build_correction_prompt(text)}],
+            api_key=os.environ.get("OPENAI_API_KEY"),
+            request_timeout=self.timeout)
+        return split_correction_response(response.choices[0].message.content)
+
+
+class LanguageToolBackend:
+    """Rule-based corrections from a local LanguageTool server"""
+
+    def __init__(self):
+        self.url = os.environ.get("LANGUAGETOOL_URL",
+                                  "http://localhost:8081/v2/check")
+
+    def correct(self, text):
+        from urllib.parse import urlencode
+        from urllib.request import urlopen
+
+        body = urlencode({'text': text, 'language': 'de-DE'}).encode('utf-8')
+        with urlopen(self.url, data=body, timeout=10) as response:
+            matches = json.load(response).get('matches', [])
+
+        # Apply the first suggestion of each match, back to front so the
+        # offsets of earlier matches stay valid
+        improved = text
+        hints = []
+        for match in sorted(matches, key=lambda m: m['offset'], reverse=True):
+            if match.get('replacements'):
+                start = match['offset']
+                end = start + match['length']
+                improved = (improved[:start] + match['replacements'][0]['value'] +
+                            improved[end:])
+            hints.append(f"- {match['message']}")
+        hint = '\n'.join(reversed(hints)) or "(kein zusätzlicher Hinweis)"
+        return improved, hint
+
+
+class StubCorrectionBackend:
+    """Offline stand-in that returns the text unchanged"""
+
+    def correct(self, text):
+        return text, "(kein zusätzlicher Hinweis)"
+
+
+CORRECTION_BACKENDS = {
+    'chatgpt': ChatGPTBrowserBackend,
+    'openai': OpenAIBackend,
+    'languagetool': LanguageToolBackend,
+    'stub': StubCorrectionBackend
+}
+
+
+class CorrectionService:
+    """Single warm worker that de-duplicates correction requests and caches results.
+
+    The backend is created inside the worker thread (Selenium drivers must
+    stay on one thread) and replaced when a call fails. Requests queued while
+    it is busy are drained together so identical texts are corrected only
+    once; the backend still receives one text per call.
+    """
+
+    def __init__(self, backend_name, batch_size=8, cache_size=512):
+        self.backend_name = backend_name
+        self.backend = None
+        self.batch_size = batch_size
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.lock = threading.Lock()
+        self.requests = queue.Queue()
+        self.worker = None
+        metrics.collect(lambda: [('correction_queue_depth', {},
+                                  self.requests.qsize())])
+
+    def correct(self, text, timeout=120):
+        """Return (improved text, hint) for a transcription"""
+        with self.lock:
+            if text in self.cache:
+                self.cache.move_to_end(text)
+                return self.cache[text]
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._run, daemon=True)
+                self.worker.start()
+        future = Future()
+        self.requests.put((text, future))
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            raise TimeoutError("correction timed out") from None
+
+    def _run(self):
+        while True:
+            batch = [self.requests.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.requests.get_nowait())
+                except queue.Empty:
+                    break
+
+            pending = {}
+            for text, future in batch:
+                pending.setdefault(text, []).append(future)
+            for text, futures in pending.items():
+                try:
+                    result = self._correct(text)
+                    with self.lock:
+                        self.cache[text] = result
+                        while len(self.cache) > self.cache_size:
+                            self.cache.popitem(last=False)
+                    for future in futures:
+                        future.set_result(result)
+                except Exception as e:
+                    for future in futures:
+                        future.set_exception(e)
+
+
+    def _correct(self, text):
+        """Call the backend, restarting it once if the call fails"""
+        for attempt in range(2):
+            if self.backend is None:
+                self.backend = CORRECTION_BACKENDS[self.backend_name]()
+            try:
+                with metrics.timer('external_call_duration_seconds',
+                                   service='correction'):
+                    return self.backend.correct(text)
+            except Exception as e:
+                logger.error(f"Correction backend failed, restarting it: {e}")
+                self._discard_backend()
+                if attempt:
+                    raise
+
+    def _discard_backend(self):
+        backend, self.backend = self.backend, None
+        try:
+            if hasattr(backend, 'close'):
+                backend.close()
+        except Exception as e:
+            logger.debug(f"Error closing correction backend: {e}")
+
+
+# LanguageTool runs headless on a server; the Windows-only Selenium
+# automation must be chosen explicitly with CORRECTION_BACKEND=chatgpt
+correction_service = CorrectionService(
+    os.environ.get("CORRECTION_BACKEND", "languagetool"))
+
+
+def auto_correct_result(transcription):
+    """Response body for a correction of the given text"""
+    try:
+        improved_text, hint = correction_service.correct(transcription)
+
+        return {
             'success': True,
             'corrected_text': f"{improved_text}\n\n------\n\n{hint}"
-        })
+        }
+    except Exception as e:
+        logger.error(f"Auto-correction error: {e}")
+        return {'success': False, 'error': str(e)}
+
+
+@app.route('/api/auto-correct', methods=['POST'])
+def auto_correct():
+    """Auto-correct the given text with the configured correction backend"""
+    try:
+        data = request.get_json()
+        return jsonify(auto_correct_result(data.get('transcription', '')))
     except Exception as e:
         logger.error(f"Auto-correction error: {e}")
         return jsonify({'success': False, 'error': str(e)})
@@ -0,0 +1,233 @@
+"""ASGI entry point, for serving many learners from one process
+
+    uv sync --extra asgi        # or: pip install -e ".[asgi]"
+    uvicorn asgi:application --host 127.0.0.1 --port 5000
+
+The endpoints that wait on remote services (Google Translate, Duden, the
+correction backend) and Whisper transcription are handled on the event loop.
+Their blocking calls run in small bounded thread pools, Whisper on the
+transcription job queue, with a timeout and a cap on queued calls, so a slow
+service answers 504/503 instead of tying up the server. Every other route is the unchanged Flask app.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import SimpleCookie
+from urllib.parse import parse_qs
+
+try:
+    from a2wsgi import WSGIMiddleware
+except ImportError:
+    raise RuntimeError(
+        "The ASGI mode requires the asgi extra (uv sync --extra asgi)")
+
+from app import (app, auto_correct_result, explain_word_result, logger, metrics,
+                 recorder_registry, transcription_jobs, translate_result)
+
+
+class PoolBusy(Exception):
+    """Raised when a pool already has its maximum of queued calls"""
+
+
+class BlockingPool:
+    """Bounded thread pool for one kind of blocking call"""
+
+    def __init__(self, name, max_concurrency, timeout, max_pending):
+        self.name = name
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency,
+                                           thread_name_prefix=f"asgi-{name}")
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.pending = 0
+        self.lock = threading.Lock()
+        metrics.collect(lambda: [('asgi_pool_pending', {'pool': self.name},
+                                  self.pending)])
+
+    def _release(self, future):
+        with self.lock:
+            self.pending -= 1
+
+    async def run(self, func, *args):
+        """Run func in the pool, raising PoolBusy or asyncio.TimeoutError"""
+        with self.lock:
+            if self.pending >= self.max_pending:
+                raise PoolBusy(f"Too many pending {self.name} requests")
+            # Counted until the thread is done, not until we stop waiting
+            self.pending += 1
+        future = self.executor.submit(func, *args)
+        future.add_done_callback(self._release)
+        return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+
+
+def make_pool(name, concurrency, timeout, max_pending):
+    """Pool whose limits can be overridden by ASGI_<NAME>_* variables"""
+    prefix = f"ASGI_{name.upper()}_"
+    return BlockingPool(
+        name,
+        max_concurrency=int(os.environ.get(prefix + "CONCURRENCY", str(concurrency))),
+        timeout=float(os.environ.get(prefix + "TIMEOUT", str(timeout))),
+        max_pending=int(os.environ.get(prefix + "MAX_PENDING", str(max_pending))))
+
+
+translate_pool = make_pool('translate', 8, 15, 64)
+duden_pool = make_pool('duden', 8, 15, 64)
+correction_pool = make_pool('correction', 4, 130, 32)
+# Whisper runs on the transcription job queue shared with /api/audio/stop,
+# whose workers and queue size (TRANSCRIPTION_*) bound inference
+WHISPER_TIMEOUT = float(os.environ.get("ASGI_WHISPER_TIMEOUT", "300"))
+
+flask_app = WSGIMiddleware(
+    app, workers=int(os.environ.get("ASGI_WSGI_WORKERS", "16")))
+
+
+def session_browser_id(scope):
+    """browser_id from the signed Flask session cookie, if any"""
+    cookies = SimpleCookie()
+    for name, value in scope['headers']:
+        if name == b'cookie':
+            cookies.load(value.decode('latin-1'))
+    cookie = cookies.get(app.config['SESSION_COOKIE_NAME'])
+    if cookie is None:
+        return None
+    serializer = app.session_interface.get_signing_serializer(app)
+    try:
+        max_age = int(app.permanent_session_lifetime.total_seconds())
+        return serializer.loads(cookie.value, max_age=max_age).get('browser_id')
+    except Exception:
+        return None
+
+
+def json_body(body):
+    try:
+        data = json.loads(body or b'null')
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        raise ValueError("Invalid JSON body")
+    return data
+
+
+async def translate_text(scope, body):
+    data = json_body(body)
+    if data.get('remember_lang'):
+        return None  # stores the preference in the session, left to Flask
+    return 200, await translate_pool.run(
+        translate_result, data.get('text', ''), data.get('target_language', 'de'))
+
+
+async def explain_word(scope, body):
+    query = parse_qs(scope['query_string'].decode('latin-1'))
+    return 200, await duden_pool.run(explain_word_result,
+                                     query.get('word', [''])[0])
+
+
+async def auto_correct(scope, body):
+    data = json_body(body)
+    return 200, await correction_pool.run(auto_correct_result,
+                                          data.get('transcription', ''))
+
+
+async def transcribe_audio(scope, body):
+    browser_id = session_browser_id(scope)
+    if browser_id is None:
+        return None  # no recorder yet, Flask creates the session
+    recorder = recorder_registry.get(browser_id)
+    try:
+        job_id = transcription_jobs.submit(recorder.transcribe_take,
+                                           recorder.last_take)
+    except RuntimeError as e:
+        raise PoolBusy(str(e))
+    await asyncio.wait_for(
+        asyncio.wrap_future(transcription_jobs.future(job_id)), WHISPER_TIMEOUT)
+    job = transcription_jobs.get(job_id)
+    if job['status'] == 'error':
+        return 200, {'success': False, 'error': job['error']}
+    return 200, {'success': True, 'transcription': job['result']}
+
+
+ROUTES = {
+    ('POST', '/api/translate'): translate_text,
+    ('GET', '/api/explain_word'): explain_word,
+    ('POST', '/api/auto-correct'): auto_correct,
+    ('POST', '/api/audio/transcribe'): transcribe_audio,
+}
+
+
+async def read_body(receive):
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+
+def replay(body, receive):
+    """receive callable that yields an already consumed body once more"""
+    sent = False
+
+    async def replayed():
+        nonlocal sent
+        if sent:
+            return await receive()
+        sent = True
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+    return replayed
+
+
+async def send_json(send, status, payload):
+    body = json.dumps(payload).encode()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'),
+                    (b'content-length', str(len(body)).encode())]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            for pool in (translate_pool, duden_pool, correction_pool):
+                pool.executor.shutdown(wait=False, cancel_futures=True)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    handler = None
+    if scope['type'] == 'http':
+        handler = ROUTES.get((scope['method'], scope['path']))
+    if handler is None:
+        return await flask_app(scope, receive, send)
+
+    started = time.perf_counter()
+    body = await read_body(receive)
+    try:
+        result = await handler(scope, body)
+    except PoolBusy as e:
+        result = 503, {'success': False, 'error': str(e)}
+    except asyncio.TimeoutError:
+        logger.error(f"Timeout in {handler.__name__}")
+        result = 504, {'success': False, 'error': 'Timeout'}
+    except Exception as e:
+        logger.error(f"Error in {handler.__name__}: {e}")
+        result = 200, {'success': False, 'error': str(e)}
+
+    if result is None:
+        return await flask_app(scope, replay(body, receive), send)
+    status, payload = result
+    await send_json(send, status, payload)
+    metrics.observe('http_request_duration_seconds',
+                    time.perf_counter() - started,
+                    endpoint=handler.__name__, method=scope['method'],
+                    status=status)
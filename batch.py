@@ -0,0 +1,58 @@
+"""Batch jobs for the video library, e.g. overnight on a CPU-only machine
+
+    python batch.py subtitles [VERZEICHNIS]
+    python batch.py thumbnails [VERZEICHNIS] [--force] [--no-covers] [--exact]
+
+An interrupted subtitle run continues where it stopped when started again.
+"""
+import argparse
+import threading
+
+from app import VIDEO_DIRECTORY, subtitle_generator, thumbnail_generator
+
+
+def report_progress(stop, interval):
+    """Print subtitle progress and throughput until stop is set"""
+    while not stop.wait(interval):
+        progress = subtitle_generator.snapshot()
+        print(f"{progress['videos_done']}/{progress['videos_total']} Videos, "
+              f"{progress['audio_seconds'] / 60:.1f} min Audio, "
+              f"{progress['realtime_factor']}x Echtzeit")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stapelverarbeitung der Videobibliothek")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    subtitles = commands.add_parser('subtitles', help="Untertitel für Videos ohne -subtitles.vtt erzeugen")
+    subtitles.add_argument('directory', nargs='?', default=VIDEO_DIRECTORY)
+    subtitles.add_argument('--report-interval', type=int, default=60,
+                           help="Sekunden zwischen Fortschrittsmeldungen")
+
+    thumbnails = commands.add_parser('thumbnails', help="Vorschaubilder und Cover erzeugen")
+    thumbnails.add_argument('directory', nargs='?', default=VIDEO_DIRECTORY)
+    thumbnails.add_argument('--force', action='store_true', help="Auch aktuelle Dateien neu erzeugen")
+    thumbnails.add_argument('--no-covers', action='store_true', help="Keine Cover erzeugen")
+    thumbnails.add_argument('--exact', action='store_true',
+                            help="Bilder genau zur Zeitmarke statt am vorigen Keyframe (langsamer)")
+
+    args = parser.parse_args()
+    if args.command == 'subtitles':
+        stop = threading.Event()
+        threading.Thread(target=report_progress, args=(stop, args.report_interval),
+                         daemon=True).start()
+        try:
+            result = subtitle_generator.generate(args.directory)
+        finally:
+            stop.set()
+    else:
+        if args.exact:
+            thumbnail_generator.exact = True
+        result = thumbnail_generator.generate(args.directory,
+                                              covers=not args.no_covers,
+                                              force=args.force)
+    print(f"Fertig: {result}")
+
+
+if __name__ == '__main__':
+    main()
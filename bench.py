@@ -0,0 +1,478 @@
+"""Benchmarks and a load driver for the video library app
+
+Everything runs offline in a temporary directory: a synthetic library with
+sidecar VTTs, large legacy usage_data.json and transcription_archive.json
+files, and stand-ins for googletrans, Duden, the correction backend and the
+Whisper model that only simulate their latency.
+
+    python bench.py                                # endpoint benchmarks
+    python bench.py --learners 20 --duration 30    # plus concurrent load
+    python bench.py --save baseline.json
+    python bench.py --compare baseline.json        # exit 1 on p95 regressions
+
+Requests go through Flask's test client, so the numbers cover the app and
+its stores but not the WSGI server or the network.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+WORDS = ("der die das und ist nicht ein eine Haus Zeit Jahr Mensch Tag Hand "
+         "Leben Frau Kind Welt Stadt Arbeit Geschichte Wasser Sprache gehen "
+         "sehen kommen machen sagen lernen verstehen sprechen schreiben "
+         "schnell langsam heute morgen immer wieder vielleicht Übung Prüfung "
+         "Straße Fräulein größer schön Bücher Mädchen Brötchen").split()
+
+
+def sentence(rng, length=8):
+    words = rng.choices(WORDS, k=length)
+    return ' '.join(words).capitalize() + '.'
+
+
+def vtt_time(seconds):
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{secs:06.3f}"
+
+
+def write_subtitles(path, rng, cues):
+    lines = ['WEBVTT', '']
+    for i in range(cues):
+        lines += [str(i + 1), f"{vtt_time(i * 3)} --> {vtt_time(i * 3 + 2.5)}",
+                  sentence(rng), '']
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+
+
+def build_library(root, rng, folders, videos_per_folder, cues, long_cues):
+    """Empty video files with subtitles, thumbnail VTTs and some covers"""
+    videos = []
+    for f in range(folders):
+        folder = os.path.join(root, f"Kurs_{f:03d}")
+        os.makedirs(folder, exist_ok=True)
+        for v in range(videos_per_folder):
+            basename = f"Lektion_{f:03d}_{v:03d}"
+            open(os.path.join(folder, f"{basename}.mp4"), 'wb').close()
+            write_subtitles(os.path.join(folder, f"{basename}-subtitles.vtt"),
+                            rng, cues)
+            with open(os.path.join(folder, f"{basename}-thumbnails.vtt"), 'w') as fh:
+                fh.write('WEBVTT\n')
+            if v % 3 == 0:
+                open(os.path.join(folder, f"{basename}.jpg"), 'wb').close()
+            videos.append(f"Kurs_{f:03d}/{basename}")
+
+    # One video at the top level with a very long subtitle file; it has a
+    # body so range requests can be checked
+    with open(os.path.join(root, "Spielfilm.mp4"), 'wb') as fh:
+        fh.write(bytes(rng.getrandbits(8) for _ in range(64 * 1024)))
+    write_subtitles(os.path.join(root, "Spielfilm-subtitles.vtt"), rng, long_cues)
+    return videos
+
+
+def build_legacy_data(workdir, rng, days, archive_entries):
+    """Legacy JSON files, imported by the app on its first start"""
+    today = date.today()
+    usage = {(today - timedelta(days=i)).isoformat(): rng.randint(0, 7200)
+             for i in range(days) if rng.random() < 0.8}
+    with open(os.path.join(workdir, "usage_data.json"), 'w') as f:
+        json.dump(usage, f)
+
+    archive = [{
+        'video_name': f"Lektion_{rng.randint(0, 99):03d}",
+        'date': (today - timedelta(days=rng.randint(0, days))).isoformat() + ' 12:00:00',
+        'transcription_html': sentence(rng, 30),
+        'improved_html': f"<p>{sentence(rng, 30)}</p>",
+        'hint_html': f"<b>{sentence(rng, 6)}</b>"
+    } for _ in range(archive_entries)]
+    with open(os.path.join(workdir, "transcription_archive.json"), 'w',
+              encoding='utf-8') as f:
+        json.dump(archive, f, ensure_ascii=False)
+
+
+class SimulatedTranslator:
+    """googletrans stand-in: a fixed round trip per batch"""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def translate(self, texts, target_language):
+        time.sleep(self.latency)
+        return [(f"[{target_language}] {text}", 'de') for text in texts]
+
+
+class SimulatedCorrector:
+    """Correction backend stand-in with a fixed round trip"""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def correct(self, text):
+        time.sleep(self.latency)
+        return text, "(kein zusätzlicher Hinweis)"
+
+
+class SimulatedSpeechModel:
+    """Whisper stand-in that takes realtime_factor x the audio duration"""
+
+    def __init__(self, realtime_factor):
+        self.realtime_factor = realtime_factor
+        self.lock = threading.Lock()
+
+    def transcribe(self, audio, language="de", prompt=None):
+        # Like the real model, inference is serialized
+        with self.lock:
+            time.sleep(len(audio) / 16000 * self.realtime_factor)
+        return "Das ist eine simulierte Transkription."
+
+    def transcribe_segments(self, audio, language="de", prompt=None):
+        return [(0.0, len(audio) / 16000, self.transcribe(audio, language, prompt))]
+
+
+def simulated_duden(latency):
+    def lookup(word):
+        time.sleep(latency)
+        if word.lower().startswith('x'):
+            return None
+        return {'meaning': f"Bedeutung von {word}", 'grammar': 'Substantiv'}
+    return lookup
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1,
+                             int(round(p / 100 * (len(sorted_values) - 1))))]
+
+
+class Recorder:
+    """Latency samples per operation, safe to share between threads"""
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self.lock = threading.Lock()
+
+    def add(self, name, seconds, ok=True):
+        with self.lock:
+            self.samples.setdefault(name, []).append(seconds)
+            if not ok:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def summary(self, elapsed=None):
+        result = {}
+        for name, values in sorted(self.samples.items()):
+            values = sorted(values)
+            result[name] = {
+                'count': len(values),
+                'errors': self.errors.get(name, 0),
+                'p50_ms': round(percentile(values, 50) * 1000, 2),
+                'p95_ms': round(percentile(values, 95) * 1000, 2),
+                'p99_ms': round(percentile(values, 99) * 1000, 2),
+            }
+            if elapsed:
+                result[name]['per_second'] = round(len(values) / elapsed, 1)
+        return result
+
+
+def print_table(title, summary):
+    print(f"\n{title}")
+    print(f"{'operation':34} {'n':>7} {'err':>5} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'req/s':>8}")
+    for name, row in summary.items():
+        print(f"{name:34} {row['count']:7d} {row['errors']:5d} "
+              f"{row['p50_ms']:9.2f} {row['p95_ms']:9.2f} {row['p99_ms']:9.2f} "
+              f"{row.get('per_second', ''):>8}")
+
+
+def timed(recorder, name, func):
+    started = time.perf_counter()
+    try:
+        response = func()
+        ok = response.status_code < 400
+        # The app reports failures as 200 with success: false
+        if ok and response.is_json and response.status_code != 304:
+            payload = response.get_json(silent=True)
+            ok = not isinstance(payload, dict) or payload.get('success', True)
+    except Exception:
+        ok = False
+    recorder.add(name, time.perf_counter() - started, ok)
+
+
+def run_endpoints(app_module, videos, rng, iterations):
+    """Sequential timings of the hot endpoints and helpers"""
+    client = app_module.app.test_client()
+    recorder = Recorder()
+    root = app_module.library_roots.default
+    folder = videos[0].split('/')[0]
+
+    for _ in range(iterations):
+        # Cold listing: the directory cache is dropped before every scan
+        app_module.directory_index.invalidate(os.path.join(root, folder))
+        started = time.perf_counter()
+        app_module.get_video_files(root, os.path.join(root, folder))
+        recorder.add('get_video_files (cold)', time.perf_counter() - started)
+        started = time.perf_counter()
+        app_module.get_video_files(root, os.path.join(root, folder))
+        recorder.add('get_video_files (warm)', time.perf_counter() - started)
+
+        video = rng.choice(videos)
+        timed(recorder, 'GET /folder', lambda: client.get(f"/folder/{folder}"))
+        timed(recorder, 'GET /player', lambda: client.get(f"/player/{video}.mp4"))
+        timed(recorder, 'GET /?search', lambda: client.get(
+            f"/?search={rng.choice(['Lektion_001', 'Kurs', 'Lektion_0'])}"))
+
+        app_module.subtitle_cache.entries.clear()
+        timed(recorder, 'get_subtitles long (cold)',
+              lambda: client.get('/api/get_subtitles/Spielfilm'))
+        response = client.get('/api/get_subtitles/Spielfilm')
+        etag = response.headers.get('ETag')
+        timed(recorder, 'get_subtitles long (304)',
+              lambda: client.get('/api/get_subtitles/Spielfilm',
+                                 headers={'If-None-Match': etag}))
+
+        timed(recorder, 'POST /api/update_usage', lambda: client.post(
+            '/api/update_usage', json={'usage_time': 10, 'video': video}))
+        timed(recorder, 'GET /api/usage/summary',
+              lambda: client.get('/api/usage/summary'))
+        timed(recorder, 'GET /archive', lambda: client.get('/archive'))
+        timed(recorder, 'GET /api/archive/search', lambda: client.get(
+            f"/api/archive/search?q={rng.choice(WORDS)}"))
+        timed(recorder, 'POST /api/archive', lambda: client.post(
+            '/api/archive', json={'video_name': video,
+                                  'transcription_html': sentence(rng, 20)}))
+        timed(recorder, 'GET /api/search_subtitles', lambda: client.get(
+            f"/api/search_subtitles?q={rng.choice(WORDS)}"))
+    return recorder.summary()
+
+
+def learner(app_module, videos, recorder, stop, seed):
+    """One simulated learner clicking through the app until stop is set"""
+    rng = random.Random(seed)
+    client = app_module.app.test_client()
+    audio = np.zeros(16000 * 5, dtype=np.float32)
+    recorder_obj = app_module.AudioRecorder()
+    actions = [
+        (20, 'usage tick', lambda v: client.post(
+            '/api/update_usage', json={'usage_time': 1, 'video': v})),
+        (10, 'explain_word', lambda v: client.get(
+            f"/api/explain_word?word={rng.choice(WORDS)}")),
+        (8, 'get_subtitles', lambda v: client.get(
+            f"/api/get_subtitles/{v}")),
+        (5, 'translate', lambda v: client.post('/api/translate', json={
+            'text': sentence(rng, 5), 'target_language': 'en'})),
+        (4, 'player page', lambda v: client.get(f"/player/{v}.mp4")),
+        (4, 'folder page', lambda v: client.get(f"/folder/{v.split('/')[0]}")),
+        (3, 'search', lambda v: client.get(
+            f"/api/search_videos?q={rng.choice(['Lektion', 'Kurs_00'])}")),
+        (3, 'subtitle search', lambda v: client.get(
+            f"/api/search_subtitles?q={rng.choice(WORDS)}")),
+        (2, 'archive search', lambda v: client.get(
+            f"/api/archive/search?q={rng.choice(WORDS)}")),
+        (2, 'auto-correct', lambda v: client.post('/api/auto-correct', json={
+            'transcription': sentence(rng, 12)})),
+        (1, 'archive add', lambda v: client.post('/api/archive', json={
+            'video_name': v, 'transcription_html': sentence(rng, 20)})),
+    ]
+    weights = [weight for weight, _, _ in actions]
+
+    while not stop.is_set():
+        video = rng.choice(videos)
+        if rng.random() < 0.02:
+            # Transcription goes through the shared queue like a real recording
+            started = time.perf_counter()
+            try:
+                job_id = app_module.transcription_jobs.submit(
+                    recorder_obj.transcribe_audio, audio)
+                while app_module.transcription_jobs.get(job_id)['status'] not in ('done', 'error'):
+                    time.sleep(0.05)
+                recorder.add('transcription job', time.perf_counter() - started)
+            except RuntimeError:
+                recorder.add('transcription job', time.perf_counter() - started, ok=False)
+            continue
+        _, name, action = rng.choices(actions, weights=weights)[0]
+        timed(recorder, name, lambda: action(video))
+
+
+def run_load(app_module, videos, learners, duration):
+    recorder = Recorder()
+    stop = threading.Event()
+    threads = [threading.Thread(target=learner,
+                                args=(app_module, videos, recorder, stop, i))
+               for i in range(learners)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return recorder.summary(elapsed=time.perf_counter() - started)
+
+
+def check_video_delivery(app_module):
+    """Range, 304 and cache headers on both video delivery paths"""
+    client = app_module.app.test_client()
+    failures = []
+
+    def expect(label, condition):
+        if not condition:
+            failures.append(label)
+
+    sendfile = app_module.VIDEO_SENDFILE
+    try:
+        app_module.VIDEO_SENDFILE = None
+        response = client.get('/videos/Spielfilm.mp4', headers={'Range': 'bytes=100-199'})
+        expect('direct: range answered with 206', response.status_code == 206)
+        expect('direct: Content-Range', response.headers.get('Content-Range') == 'bytes 100-199/65536')
+        expect('direct: range body length', len(response.data) == 100)
+        etag = client.get('/videos/Spielfilm.mp4').headers.get('ETag')
+        response = client.get('/videos/Spielfilm.mp4', headers={'If-None-Match': etag})
+        expect('direct: If-None-Match answered with 304', response.status_code == 304)
+        response = client.get('/videos/Spielfilm.mp4',
+                              headers={'Range': 'bytes=0-9', 'If-Range': '"stale"'})
+        expect('direct: stale If-Range returns the full file', response.status_code == 200)
+
+        with app_module.app.test_request_context():
+            app_module.load_last_directory()
+            versioned = app_module.asset_url('Spielfilm-subtitles.vtt')
+        response = client.get(versioned)
+        expect('direct: versioned sidecar immutable',
+               response.cache_control.immutable and response.cache_control.max_age == app_module.ASSET_MAX_AGE)
+        response = client.get('/videos/Spielfilm-subtitles.vtt')
+        expect('direct: unversioned sidecar revalidated', response.cache_control.no_cache)
+
+        # The proxy answers ranges and validators, Flask only hands over the path
+        app_module.VIDEO_SENDFILE = 'x-accel'
+        response = client.get('/videos/Spielfilm.mp4', headers={'Range': 'bytes=100-199'})
+        expect('x-accel: redirect header',
+               response.headers.get('X-Accel-Redirect', '').endswith('/Spielfilm.mp4'))
+        expect('x-accel: no body from Flask', response.data == b'')
+        expect('x-accel: no Content-Range from Flask', 'Content-Range' not in response.headers)
+        response = client.get(versioned)
+        expect('x-accel: versioned sidecar immutable', response.cache_control.immutable)
+    finally:
+        app_module.VIDEO_SENDFILE = sendfile
+    return failures
+
+
+def stop_background_jobs(app_module):
+    """Drop queued jobs and let running ones finish before the data goes away"""
+    app_module.dictionary_cache.prefetch_delay = 0
+    app_module.dictionary_cache.lookup = lambda word: None
+    for jobs in (app_module.dictionary_jobs, app_module.transcription_jobs,
+                 app_module.thumbnail_jobs, app_module.subtitle_jobs):
+        jobs.executor.shutdown(wait=True, cancel_futures=True)
+
+
+def compare(results, baseline_path, tolerance):
+    """Print p95 regressions against a saved run; True if there are none"""
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)
+    regressions = []
+    for section, rows in results.items():
+        for name, row in rows.items():
+            before = baseline.get(section, {}).get(name)
+            if before and before['p95_ms'] > 0.5 and \
+                    row['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+                regressions.append(f"{section}/{name}: p95 {before['p95_ms']} ms -> {row['p95_ms']} ms")
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return not regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--folders', type=int, default=40)
+    parser.add_argument('--videos-per-folder', type=int, default=50)
+    parser.add_argument('--cues', type=int, default=300, help="cues per subtitle file")
+    parser.add_argument('--long-cues', type=int, default=20000)
+    parser.add_argument('--usage-days', type=int, default=3650)
+    parser.add_argument('--archive-entries', type=int, default=20000)
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--learners', type=int, default=0)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--network-latency', type=float, default=0.15,
+                        help="seconds per simulated googletrans/Duden/correction call")
+    parser.add_argument('--whisper-rtf', type=float, default=0.3,
+                        help="simulated Whisper real-time factor")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--save', help="write results as JSON")
+    parser.add_argument('--compare', help="baseline JSON from --save")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed p95 slowdown against the baseline")
+    args = parser.parse_args()
+
+    save_path = os.path.abspath(args.save) if args.save else None
+    baseline_path = os.path.abspath(args.compare) if args.compare else None
+    rng = random.Random(args.seed)
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="videotimetracker-bench-")
+    app_module = None
+    try:
+        library = os.path.join(workdir, "videos")
+        started = time.perf_counter()
+        videos = build_library(library, rng, args.folders, args.videos_per_folder,
+                               args.cues, args.long_cues)
+        build_legacy_data(workdir, rng, args.usage_days, args.archive_entries)
+        print(f"Synthetic data in {workdir} ({len(videos)} videos) "
+              f"built in {time.perf_counter() - started:.1f}s")
+
+        # The app keeps its databases in the working directory and reads its
+        # configuration at import time
+        os.environ.update(VIDEO_DIRECTORY=library, TRANSLATION_BACKEND='stub',
+                          CORRECTION_BACKEND='stub', WHISPER_WARMUP='0')
+        os.chdir(workdir)
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        started = time.perf_counter()
+        import app as app_module
+        import_seconds = time.perf_counter() - started
+        print(f"App import incl. legacy JSON migration: {import_seconds:.2f}s")
+        logging.getLogger().setLevel(logging.WARNING)
+
+        app_module.translation_service.backend = SimulatedTranslator(args.network_latency)
+        app_module.correction_service.backend = SimulatedCorrector(args.network_latency)
+        app_module.dictionary_cache.lookup = simulated_duden(args.network_latency)
+        app_module.speech_model = SimulatedSpeechModel(args.whisper_rtf)
+        app_module.library_roots.register(app_module.library_roots.default)
+
+        results = {'startup': {'import + migration': {
+            'count': 1, 'errors': 0, 'p50_ms': round(import_seconds * 1000, 2),
+            'p95_ms': round(import_seconds * 1000, 2),
+            'p99_ms': round(import_seconds * 1000, 2)}}}
+        failures = check_video_delivery(app_module)
+        for failure in failures:
+            print(f"Video delivery check failed: {failure}")
+        results['endpoints'] = run_endpoints(app_module, videos, rng, args.iterations)
+        print_table("Endpoints (sequential)", results['endpoints'])
+
+        if args.learners:
+            results['load'] = run_load(app_module, videos, args.learners, args.duration)
+            print_table(f"Load: {args.learners} learners for {args.duration:.0f}s",
+                        results['load'])
+
+        if save_path:
+            with open(save_path, 'w') as f:
+                json.dump(results, f, indent=2)
+        if failures or (baseline_path and not compare(results, baseline_path, args.tolerance)):
+            sys.exit(1)
+    finally:
+        if app_module is not None:
+            stop_background_jobs(app_module)
+        # Index watchers still hold their databases open, so whatever cannot
+        # be removed yet is left behind
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
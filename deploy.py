@@ -1,52 +1,216 @@
+"""Deploy this checkout into the installed app directory
+
+    python deploy.py --target D:\\Applications\\Portable\\VideoTimeTracker \\
+                     --backup D:\\Backups\\Documents\\VideoTimeTracker [--dry-run]
+
+The paths can also come from DEPLOY_TARGET and DEPLOY_BACKUP. Only files
+whose size or content changed are copied, each one atomically via a temporary
+file and rename. User data in the target is never overwritten or deleted; it
+is saved as a versioned snapshot in the backup directory before every deploy.
+"""
+import argparse
+import hashlib
+import json
 import os
+import re
 import shutil
+import sqlite3
+import time
+
+# User data and runtime files that live only in the target
+user_data_files = {"transcription_archive.json", "transcription_archive.db",
+                   "usage_data.json", "usage_data.db"}
+runtime_files = {"library_index.json", "subtitle_index.db",
+                 "translation_cache.db", "dictionary_cache.db",
+                 "temp_audio.wav", "deploy.py"}
+exclude_dirs = {".git", "__pycache__", ".venv", "videos", "profiles"}
+exclude_suffixes = ("-wal", "-shm", "-journal", ".deploy-tmp")
+
+MANIFEST_FILE = ".deploy-manifest.json"
+SNAPSHOT_PREFIX = "snapshot-"
+SNAPSHOT_NAME = re.compile(re.escape(SNAPSHOT_PREFIX) + r"(\d{8}-\d{6})(?:-(\d+))?")
+
+
+def is_excluded(name):
+    return (name in user_data_files or name in runtime_files
+            or name == MANIFEST_FILE or name.endswith(exclude_suffixes))
+
+
+def source_files(source_dir):
+    """Relative paths of all files to deploy"""
+    files = []
+    for root, dirs, names in os.walk(source_dir):
+        dirs[:] = sorted(d for d in dirs if d not in exclude_dirs)
+        for name in sorted(names):
+            if not is_excluded(name):
+                files.append(os.path.relpath(os.path.join(root, name), source_dir))
+    return files
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_unchanged(source, destination, dry_run=False):
+    """Compare size and mtime first, hash only when the mtime differs"""
+    try:
+        dst = os.stat(destination)
+    except FileNotFoundError:
+        return False
+    src = os.stat(source)
+    if src.st_size != dst.st_size:
+        return False
+    if src.st_mtime_ns == dst.st_mtime_ns:
+        return True
+    if file_hash(source) != file_hash(destination):
+        return False
+    # Same content: take over the mtime so the next deploy skips the hashing
+    if not dry_run:
+        os.utime(destination, ns=(src.st_atime_ns, src.st_mtime_ns))
+    return True
+
+
+def atomic_copy(source, destination):
+    """Copy via a temporary file next to the destination and rename"""
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    temp_path = destination + ".deploy-tmp"
+    try:
+        shutil.copy2(source, temp_path)
+        os.replace(temp_path, destination)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def new_snapshot_dir(backup_dir):
+    """Unused snapshot-YYYYmmdd-HHMMSS[-N] path; deploys in one second get -2, -3, ..."""
+    base = os.path.join(backup_dir, SNAPSHOT_PREFIX + time.strftime("%Y%m%d-%H%M%S"))
+    path, n = base, 1
+    while os.path.exists(path):
+        n += 1
+        path = f"{base}-{n}"
+    return path
+
+
+def snapshot_user_data(target_dir, backup_dir, keep, dry_run):
+    """Save the user data into a new timestamped backup folder"""
+    present = [name for name in sorted(user_data_files)
+               if os.path.exists(os.path.join(target_dir, name))]
+    if not present:
+        print("Keine Benutzerdaten gefunden, keine Sicherung nötig")
+        return
+
+    snapshot_dir = new_snapshot_dir(backup_dir)
+    for name in present:
+        print(f"Sichern: {name} -> {snapshot_dir}")
+    if dry_run:
+        return
+
+    os.makedirs(snapshot_dir)
+    for name in present:
+        source = os.path.join(target_dir, name)
+        destination = os.path.join(snapshot_dir, name)
+        if name.endswith(".db"):
+            # The SQLite backup API includes the -wal contents consistently
+            src, dst = sqlite3.connect(source), sqlite3.connect(destination)
+            try:
+                src.backup(dst)
+            finally:
+                dst.close()
+                src.close()
+        else:
+            atomic_copy(source, destination)
+
+    # Only our own snapshot folders are pruned, oldest first
+    snapshots = []
+    for name in os.listdir(backup_dir):
+        match = SNAPSHOT_NAME.fullmatch(name)
+        if match and os.path.isdir(os.path.join(backup_dir, name)):
+            snapshots.append((match.group(1), int(match.group(2) or 1), name))
+    for _, _, old in sorted(snapshots)[:-keep]:
+        shutil.rmtree(os.path.join(backup_dir, old))
+        print(f"Alte Sicherung gelöscht: {old}")
+
+
+def load_manifest(target_dir):
+    try:
+        with open(os.path.join(target_dir, MANIFEST_FILE), encoding='utf-8') as f:
+            return set(json.load(f))
+    except (FileNotFoundError, ValueError):
+        return set()
+
+
+def save_manifest(target_dir, files):
+    path = os.path.join(target_dir, MANIFEST_FILE)
+    with open(path + ".deploy-tmp", 'w', encoding='utf-8') as f:
+        json.dump(sorted(files), f, indent=1)
+    os.replace(path + ".deploy-tmp", path)
+
+
+def sync(source_dir, target_dir, dry_run):
+    """Copy changed files and remove files that were deployed before but are gone"""
+    files = source_files(source_dir)
+    copied = 0
+    for rel_path in files:
+        source = os.path.join(source_dir, rel_path)
+        destination = os.path.join(target_dir, rel_path)
+        if is_unchanged(source, destination, dry_run):
+            continue
+        print(f"Kopieren: {rel_path}")
+        copied += 1
+        if not dry_run:
+            atomic_copy(source, destination)
+
+    # Only files listed in the last manifest are ours to delete
+    removed = 0
+    for rel_path in sorted(load_manifest(target_dir) - set(files)):
+        if is_excluded(os.path.basename(rel_path)):
+            continue
+        path = os.path.join(target_dir, rel_path)
+        if os.path.isfile(path):
+            print(f"Löschen: {rel_path}")
+            removed += 1
+            if not dry_run:
+                os.remove(path)
+
+    if not dry_run:
+        save_manifest(target_dir, files)
+    return copied, removed, len(files) - copied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Videobibliothek inkrementell bereitstellen")
+    parser.add_argument('--target', default=os.environ.get("DEPLOY_TARGET"),
+                        help="Installationsverzeichnis (Standard: DEPLOY_TARGET)")
+    parser.add_argument('--backup', default=os.environ.get("DEPLOY_BACKUP"),
+                        help="Sicherungsverzeichnis (Standard: DEPLOY_BACKUP)")
+    parser.add_argument('--keep', type=int, default=int(os.environ.get("DEPLOY_KEEP_BACKUPS", "20")),
+                        help="Anzahl der aufbewahrten Sicherungen")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Nur anzeigen, was geändert würde")
+    args = parser.parse_args()
+    if not args.target or not args.backup:
+        parser.error("--target und --backup (oder DEPLOY_TARGET/DEPLOY_BACKUP) sind erforderlich")
+
+    source_dir = os.path.dirname(os.path.abspath(__file__))
+    target_dir = os.path.abspath(args.target)
+    if os.path.normcase(source_dir) == os.path.normcase(target_dir):
+        parser.error("Quell- und Zielverzeichnis sind identisch")
+    print(f"Skriptverzeichnis: {source_dir}")
+    print(f"Zielverzeichnis: {target_dir}")
+    if args.dry_run:
+        print("Probelauf: es werden keine Dateien geändert")
+
+    started = time.perf_counter()
+    snapshot_user_data(target_dir, os.path.abspath(args.backup), max(args.keep, 1), args.dry_run)
+    copied, removed, unchanged = sync(source_dir, target_dir, args.dry_run)
+    print(f"{copied} kopiert, {removed} gelöscht, {unchanged} unverändert "
+          f"({time.perf_counter() - started:.1f} s)")
+
 
-# Define paths
-source_dir = r"D:\Applications\Portable\VideoTimeTracker"
-backup_dir = r"D:\Backups\Documents\VideoTimeTracker"
-
-# Files and folders to exclude
-exclude_files = {"transcription_archive.json", "usage_data.json", "deploy.py", "temp_audio.wav"}
-exclude_dirs = {".git"}
-
-# Step 1: Copy specific files to the backup directory
-os.makedirs(backup_dir, exist_ok=True)
-print(f"Sicherungsverzeichnis erstellt oder existiert bereits: {backup_dir}")
-
-for file_name in exclude_files:
-    source_file = os.path.join(source_dir, file_name)
-    if os.path.exists(source_file):
-        shutil.copy2(source_file, backup_dir)
-        print(f"{source_file} wurde nach {backup_dir} kopiert")
-    else:
-        print(f"Datei nicht gefunden, übersprungen: {source_file}")
-
-# Schritt 2: Alle Dateien und Ordner außer den ausgeschlossenen im Quellverzeichnis löschen
-for file_name in os.listdir(source_dir):
-    file_path = os.path.join(source_dir, file_name)
-    if file_name in exclude_files or file_name in exclude_dirs:
-        print(f"Ausgeschlossene Datei oder Ordner übersprungen: {file_name}")
-        continue
-    if os.path.isfile(file_path):
-        os.remove(file_path)
-        print(f"Datei gelöscht: {file_path}")
-    elif os.path.isdir(file_path):
-        shutil.rmtree(file_path)
-        print(f"Ordner gelöscht: {file_path}")
-
-# Schritt 3: Alle Dateien aus dem Verzeichnis des Skripts ins Quellverzeichnis kopieren, außer den ausgeschlossenen
-script_dir = os.path.dirname(os.path.abspath(__file__))
-print(f"Skriptverzeichnis: {script_dir}")
-
-for file_name in os.listdir(script_dir):
-    if (file_name not in exclude_files) and (file_name not in exclude_dirs):
-        source_file = os.path.join(script_dir, file_name)
-        destination_file = os.path.join(source_dir, file_name)
-        if os.path.isfile(source_file):
-            shutil.copy2(source_file, destination_file)
-            print(f"Datei {source_file} wurde nach {destination_file} kopiert")
-        elif os.path.isdir(source_file):
-            shutil.copytree(source_file, destination_file, dirs_exist_ok=True)
-            print(f"Ordner {source_file} wurde nach {destination_file} kopiert")
-
-print("Operation erfolgreich abgeschlossen.")
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -405,6 +405,84 @@ Außer diesen beiden Teilen sollst du nichts weiter sagen. Wenn es keinen zusät
     let isRecording = false;
     let isPaused = false;
 
+    let transcriptionStream = null;
+    let levelTimer = null;
+
+    // Poll the input level while capturing; stops as soon as recording pauses
+    function updateLevelMeter() {
+        const meter = document.getElementById('recording-level');
+        if (!meter) return;
+        clearTimeout(levelTimer);
+        if (!isRecording || isPaused) {
+            meter.style.width = '0%';
+            return;
+        }
+        fetch('/api/audio/level')
+            .then(response => response.json())
+            .then(data => {
+                // RMS of speech is far below full scale, so show it in dB
+                const db = data.level > 0 ? 20 * Math.log10(data.level) : -60;
+                meter.style.width = `${Math.max(0, Math.min(100, (db + 60) / 60 * 100))}%`;
+            })
+            .catch(() => {})
+            .finally(() => {
+                if (isRecording && !isPaused) {
+                    levelTimer = setTimeout(updateLevelMeter, 200);
+                }
+            });
+    }
+
+    // Show partial and final segments while the recording is still running
+    function openTranscriptionStream() {
+        if (transcriptionStream) {
+            transcriptionStream.close();
+        }
+        const finalSegments = [];
+        transcriptionStream = new EventSource('/api/audio/stream');
+        transcriptionStream.addEventListener('partial', event => {
+            const data = JSON.parse(event.data);
+            transcriptionText.innerText = finalSegments.concat(data.text).join(' ').trim();
+        });
+        transcriptionStream.addEventListener('final', event => {
+            const data = JSON.parse(event.data);
+            if (data.text) {
+                finalSegments.push(data.text);
+            }
+            transcriptionText.innerText = finalSegments.join(' ');
+        });
+        transcriptionStream.addEventListener('done', () => {
+            transcriptionStream.close();
+            transcriptionStream = null;
+        });
+        transcriptionStream.onerror = () => {
+            transcriptionStream.close();
+            transcriptionStream = null;
+        };
+    }
+
+    function pollTranscriptionJob(jobId) {
+        fetch(`/api/audio/jobs/${jobId}`)
+            .then(response => response.json())
+            .then(data => {
+                if (!data.success) {
+                    transcriptionText.innerText = '';
+                    return;
+                }
+                if (data.status === 'done') {
+                    transcriptionText.innerText = data.transcription || '';
+                } else if (data.status === 'error') {
+                    transcriptionText.innerText = '';
+                    console.error('Transcription error:', data.error);
+                } else {
+                    setTimeout(() => pollTranscriptionJob(jobId), 1000);
+                }
+            })
+            .catch(error => {
+                console.error('Error polling transcription job:', error);
+                setTimeout(() => pollTranscriptionJob(jobId), 3000);
+            });
+    }
+
     if (toggleRecordingBtn && pauseRecordingBtn) {
         toggleRecordingBtn.addEventListener('click', function() {
             if (!isRecording) {
@@ -412,13 +490,19 @@ Außer diesen beiden Teilen sollst du nichts weiter sagen. Wenn es keinen zusät
                 toggleRecordingBtn.innerHTML = '<span class="spinner-border spinner-border-sm" role="status"></span> Starte...';
                 toggleRecordingBtn.disabled = true;
 
-                fetch('/api/audio/start', { method: 'POST' })
+                fetch('/api/audio/start', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ stream: true })
+                })
                     .then(response => response.json())
                     .then(data => {
                         if (data.success) {
                             isRecording = true;
                             isPaused = false;
                             transcriptionText.innerText = ''; // Clear previous transcription
+                            openTranscriptionStream();
+                            updateLevelMeter();
                             document.getElementById('improved-text').innerText = ''; // Clear previous improved text
                             document.getElementById('additional-hint').innerText = ''; // Clear previous hint text
                             toggleRecordingBtn.innerHTML = '<i class="material-icons align-middle">stop</i> Aufnahme beenden';
@@ -444,18 +528,18 @@ Außer diesen beiden Teilen sollst du nichts weiter sagen. Wenn es keinen zusät
                                 audioPlayer.src = data.audio_path + '?t=' + new Date().getTime();
                                 audioPlayer.style.display = 'block';
                                 
-                                // Start transcription after showing audio
-                                fetch('/api/audio/transcribe', { method: 'POST' })
-                                    .then(response => response.json())
-                                    .then(data => {
-                                        if (data.success && data.transcription) {
-                                            transcriptionText.innerText = data.transcription;
-                                        }
-                                    });
+                                // Poll the background transcription job
+                                if (data.job_id) {
+                                    if (!transcriptionStream) {
+                                        transcriptionText.innerText = 'Transkribiere...';
+                                    }
+                                    pollTranscriptionJob(data.job_id);
+                                }
                             }
                         }
                         isRecording = false;
                         isPaused = false;
+                        updateLevelMeter();
                         toggleRecordingBtn.innerHTML = '<i class="material-icons align-middle">mic</i> Aufnahme starten';
                         toggleRecordingBtn.className = 'btn btn-primary';
                         pauseRecordingBtn.disabled = true;
@@ -479,6 +563,7 @@ Außer diesen beiden Teilen sollst du nichts weiter sagen. Wenn es keinen zusät
                     .then(data => {
                         if (data.success) {
                             isPaused = true;
+                            updateLevelMeter();
                             pauseRecordingBtn.innerHTML = '<i class="material-icons align-middle">play_arrow</i> Fortsetzen';
                         }
                     })
@@ -493,6 +578,7 @@ Außer diesen beiden Teilen sollst du nichts weiter sagen. Wenn es keinen zusät
                     .then(data => {
                         if (data.success) {
                             isPaused = false;
+                            updateLevelMeter();
                             pauseRecordingBtn.innerHTML = '<i class="material-icons align-middle">pause</i> Pause';
                         }
                     })
@@ -753,7 +839,7 @@ Außer diesen beiden Teilen sollst du nichts weiter sagen. Wenn es keinen zusät
     const player = new Plyr('#player', {
         captions: { active: true, language: 'auto', update: true },
         seekTime: 5,
-        previewThumbnails: hasThumbnails ? { enabled: true, src: `/videos/${videoBasename}-thumbnails.vtt` } : { enabled: false },
+        previewThumbnails: hasThumbnails ? { enabled: true, src: videoElement.dataset.thumbnailsSrc } : { enabled: false },
         controls: ['play-large', 'play', 'progress', 'current-time', 'mute', 'volume', 'captions', 'settings', 'pip']
     });
 
@@ -790,6 +876,14 @@ Außer diesen beiden Teilen sollst du nichts weiter sagen. Wenn es keinen zusät
         }
     });
 
+    // Jump to a timestamp passed from a subtitle search hit (?t=seconds)
+    const startAt = parseFloat(new URLSearchParams(window.location.search).get('t'));
+    if (!isNaN(startAt)) {
+        player.once('loadedmetadata', () => {
+            player.currentTime = startAt;
+        });
+    }
+
     // Wait for player to be ready before setting up keyboard navigation
     player.on('ready', () => {
         // Keyboard navigation
@@ -1141,6 +1235,7 @@ Außer diesen beiden Teilen sollst du nichts weiter sagen. Wenn es keinen zusät
     const subtitleLanguageControls = document.querySelector('.subtitle-language-controls');
     const subtitleLanguageSelect = document.getElementById('subtitle-language');
     let subtitles = [];
+    let subtitleStarts = [];
     let currentSubtitleIndex = -1;
     let translatedSubtitles = null;
     let originalSubtitleText = null;
@@ -1203,6 +1298,7 @@ Außer diesen beiden Teilen sollst du nichts weiter sagen. Wenn es keinen zusät
             .then(data => {
                 if (data.success) {
                     subtitles = data.subtitles;
+                    subtitleStarts = data.starts || subtitles.map(subtitle => subtitle.start_seconds);
                     renderSubtitleList(subtitles);
 
                     // Listen for timeupdate to highlight current subtitle
@@ -1216,22 +1312,6 @@ Außer diesen beiden Teilen sollst du nichts weiter sagen. Wenn es keinen zusät
             });
     }
 
-    // Convert VTT time format to seconds
-    function timeToSeconds(time) {
-        const parts = time.split(':');
-        let seconds = 0;
-
-        if (parts.length === 3) {
-            // Hours:Minutes:Seconds.Milliseconds
-            seconds = parseFloat(parts[0]) * 3600 + parseFloat(parts[1]) * 60 + parseFloat(parts[2]);
-        } else if (parts.length === 2) {
-            // Minutes:Seconds.Milliseconds
-            seconds = parseFloat(parts[0]) * 60 + parseFloat(parts[1]);
-        }
-
-        return seconds;
-    }
-
     // Highlight the current subtitle in the list
     function highlightCurrentSubtitle() {
         if (!subtitles.length) return;
@@ -1239,16 +1319,21 @@ Außer diesen beiden Teilen sollst du nichts weiter sagen. Wenn es keinen zusät
         const currentTime = player.currentTime;
         let foundIndex = -1;
 
-        // Find the current subtitle
-        for (let i = 0; i < subtitles.length; i++) {
-            const startTime = timeToSeconds(subtitles[i].start);
-            const endTime = timeToSeconds(subtitles[i].end);
-
-            if (currentTime >= startTime && currentTime <= endTime) {
-                foundIndex = i;
-                break;
+        // Binary-search the last cue starting at or before the current time
+        let low = 0;
+        let high = subtitleStarts.length - 1;
+        while (low <= high) {
+            const mid = (low + high) >> 1;
+            if (subtitleStarts[mid] <= currentTime) {
+                foundIndex = mid;
+                low = mid + 1;
+            } else {
+                high = mid - 1;
             }
         }
+        if (foundIndex >= 0 && currentTime > subtitles[foundIndex].end_seconds) {
+            foundIndex = -1;
+        }
 
         // Update highlight only if changed
         if (foundIndex !== currentSubtitleIndex) {
@@ -1305,8 +1390,7 @@ Außer diesen beiden Teilen sollst du nichts weiter sagen. Wenn es keinen zusät
             item.addEventListener('click', function() {
                 const index = parseInt(this.dataset.index);
                 if (index >= 0 && index < subtitles.length) {
-                    const startTime = timeToSeconds(subtitles[index].start);
-                    player.currentTime = startTime;
+                    player.currentTime = subtitles[index].start_seconds;
                     player.play();
                 }
             });
@@ -1489,63 +1573,34 @@ Außer diesen beiden Teilen sollst du nichts weiter sagen. Wenn es keinen zusät
             </div>
         `;
 
-        // Collect all subtitle texts
-        const textsToTranslate = subtitles.map(sub => sub.text);
-
-        // Translate in chunks to avoid API limits
-        const chunkSize = 10;
-        const translatedChunks = [];
-
-        const translateChunk = async (chunkIndex) => {
-            const start = chunkIndex * chunkSize;
-            const end = Math.min(start + chunkSize, textsToTranslate.length);
-            const chunk = textsToTranslate.slice(start, end);
-
-            if (chunk.length === 0) {
-                // All chunks translated, update UI
-                translatedSubtitles = [...subtitles];
-
-                for (let i = 0; i < translatedSubtitles.length; i++) {
-                    translatedSubtitles[i] = {
-                        ...translatedSubtitles[i],
-                        text: translatedChunks[i]
-                    };
+        // Translate all subtitle texts in one batch request
+        fetch('/api/translate_batch', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                texts: subtitles.map(sub => sub.text),
+                target_language: targetLang
+            })
+        })
+            .then(response => response.json())
+            .then(data => {
+                if (!data.success) {
+                    subtitleList.innerHTML = `<div class="alert alert-danger">Übersetzungsfehler: ${data.error}</div>`;
+                    return;
                 }
 
+                // Cues whose translation failed keep their original text
+                translatedSubtitles = subtitles.map((subtitle, i) => ({
+                    ...subtitle,
+                    text: data.translated_texts[i] ?? subtitle.text
+                }));
                 renderSubtitleList(translatedSubtitles);
-                return;
-            }
-
-            try {
-                // Translate this chunk
-                const promises = chunk.map(text => 
-                    fetch('/api/translate', {
-                        method: 'POST',
-                        headers: {
-                            'Content-Type': 'application/json'
-                        },
-                        body: JSON.stringify({
-                            text: text,
-                            target_language: targetLang
-                        })
-                    })
-                    .then(response => response.json())
-                    .then(data => data.success ? data.translated_text : text)
-                );
-
-                const results = await Promise.all(promises);
-                translatedChunks.push(...results);
-
-                // Translate next chunk
-                translateChunk(chunkIndex + 1);
-
-            } catch (error) {
+            })
+            .catch(error => {
                 subtitleList.innerHTML = `<div class="alert alert-danger">Übersetzungsfehler: ${error}</div>`;
-            }
-        };
-
-        // Start translation
-        translateChunk(0);
+            });
     }
 
     // Handle file upload for subtitles/thumbnails
@@ -7,6 +7,7 @@ document.addEventListener('DOMContentLoaded', function() {
         e.preventDefault();
         const searchQuery = searchInput.value.trim();
         const currentUrl = new URL(window.location.href);
+        currentUrl.searchParams.delete('page');
         
         if (searchQuery) {
             currentUrl.searchParams.set('search', searchQuery);
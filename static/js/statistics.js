@@ -45,56 +45,62 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
     
-    // Load usage data
-    fetch('/api/get_usage_data')
+    function toDateString(date) {
+        return date.toISOString().split('T')[0];
+    }
+
+    function formatHoursMinutes(seconds) {
+        const hours = Math.floor(seconds / 3600);
+        const minutes = Math.floor((seconds % 3600) / 60);
+        return `${hours}h ${minutes}m`;
+    }
+
+    // Load pre-aggregated statistics, then the whole history for the chart
+    const today = toDateString(now);
+    fetch(`/api/usage/summary?today=${today}`)
         .then(response => response.json())
         .then(data => {
-            usageData = data;
-            updateCalendarView();
-            renderChart(data);
-            updateStatistics(data);
+            if (!data.success) return;
+            updateStatistics(data.summary);
+            if (!data.summary.first_date) return;
+            return fetch(`/api/usage/range?start=${data.summary.first_date}&end=${today}`)
+                .then(response => response.json())
+                .then(data => {
+                    if (data.success) {
+                        renderChart(data.days);
+                    }
+                });
         })
         .catch(error => console.error('Error loading usage data:', error));
 
-    function updateStatistics(data) {
-        const dates = Object.keys(data);
-        if (dates.length === 0) return;
-
-        // Calculate total time
-        const totalSeconds = Object.values(data).reduce((sum, seconds) => sum + seconds, 0);
-        const totalHours = Math.floor(totalSeconds / 3600);
-        const totalMinutes = Math.floor((totalSeconds % 3600) / 60);
-        document.getElementById('total-time').textContent = `${totalHours}h ${totalMinutes}m`;
-
-        // Calculate total visits (days)
-        document.getElementById('total-days').textContent = dates.length;
+    updateCalendarView();
 
-        // Calculate visit rate
-        const firstDate = new Date(dates.sort()[0]);
-        const lastDate = new Date();
-        const totalDays = Math.ceil((lastDate - firstDate) / (1000 * 60 * 60 * 24)) + 1;
-        const visitRate = ((dates.length / totalDays) * 100).toFixed(1);
-        document.getElementById('visit-rate').textContent = `${visitRate}%`;
+    function updateStatistics(summary) {
+        if (summary.active_days === 0) return;
 
-        // Calculate max daily time
-        const maxSeconds = Math.max(...Object.values(data));
-        const maxHours = Math.floor(maxSeconds / 3600);
-        const maxMinutes = Math.floor((maxSeconds % 3600) / 60);
-        document.getElementById('max-daily-time').textContent = `${maxHours}h ${maxMinutes}m`;
-
-        // Calculate average daily time
-        const avgSeconds = totalSeconds / dates.length;
-        const avgHours = Math.floor(avgSeconds / 3600);
-        const avgMinutes = Math.floor((avgSeconds % 3600) / 60);
-        document.getElementById('avg-daily-time').textContent = `${avgHours}h ${avgMinutes}m`;
+        document.getElementById('total-time').textContent = formatHoursMinutes(summary.total_seconds);
+        document.getElementById('total-days').textContent = summary.active_days;
+        document.getElementById('visit-rate').textContent = `${(summary.visit_rate * 100).toFixed(1)}%`;
+        document.getElementById('max-daily-time').textContent = formatHoursMinutes(summary.max_daily_seconds);
+        document.getElementById('avg-daily-time').textContent = formatHoursMinutes(summary.avg_daily_seconds);
+        document.getElementById('current-streak').textContent = `${summary.current_streak} Tage`;
+        document.getElementById('longest-streak').textContent = `${summary.longest_streak} Tage`;
     }
     
-    // Update month display and regenerate calendar
+    // Update month display and load the month's days before rendering
     function updateCalendarView() {
         if (currentMonthDisplay) {
             currentMonthDisplay.textContent = `${monthNames[currentMonth]} ${currentYear}`;
         }
-        renderCalendar();
+
+        const month = `${currentYear}-${(currentMonth + 1).toString().padStart(2, '0')}`;
+        fetch(`/api/usage/range?start=${month}-01&end=${month}-31`)
+            .then(response => response.json())
+            .then(data => {
+                usageData = data.success ? data.days : {};
+                renderCalendar();
+            })
+            .catch(error => console.error('Error loading usage data:', error));
     }
     
     // Render calendar view
@@ -79,6 +79,8 @@ document.addEventListener('DOMContentLoaded', function() {
             // Record usage data
             const today = new Date().toISOString().split('T')[0];
 
+            const playerElement = document.getElementById('player');
+
             fetch('/api/update_usage', {
                 method: 'POST',
                 headers: {
@@ -86,8 +88,11 @@ document.addEventListener('DOMContentLoaded', function() {
                 },
                 body: JSON.stringify({
                     usage_time: sessionTime,
-                    date: today
-                })
+                    date: today,
+                    video: playerElement ? playerElement.dataset.basename : null
+                }),
+                // Let the request outlive the page on unload
+                keepalive: true
             })
             .then(response => response.json())
             .catch(error => console.error('Error updating usage data:', error));
@@ -102,10 +107,10 @@ document.addEventListener('DOMContentLoaded', function() {
     function loadTodayUsage() {
         const today = new Date().toISOString().split('T')[0];
 
-        fetch('/api/get_usage_data')
+        fetch(`/api/usage/today?date=${today}`)
             .then(response => response.json())
             .then(data => {
-                const todayTime = data[today] || 0;
+                const todayTime = data.success ? data.seconds : 0;
                 elapsedTime = todayTime * 1000; // Convert seconds to milliseconds
                 updateTodayCounter();
             })